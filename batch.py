@@ -0,0 +1,196 @@
+"""Headless batch generation of CSV Populator records.
+
+Usage:
+    python csv_populator.py batch --template fields.json --id-name WO --start-id 100 --count 1000 --output out.csv
+    python csv_populator.py batch --template fields.json --id-name WO --start-id WO100 --values rows.jsonl
+
+Records flow through a chain of generators (IDs -> value rows -> records ->
+CSV rows), so memory stays flat no matter how many rows are produced.
+This module must not import tkinter.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+
+from csv_export import (
+    DEFAULT_FORMAT,
+    LAYOUT_RECORDS,
+    LAYOUT_UNIFIED,
+    add_format_arguments,
+    compression_for,
+    format_from_args,
+    iter_unified_rows,
+    write_record_rows
+)
+from ids import IDAllocator
+from output_formats import KIND_CSV, KIND_JSONL, output_kind, write_jsonl
+from record_store import Record, build_record
+from templates import read_template
+
+
+# IDs allocated at a time for generated records
+ID_BLOCK_SIZE = 4096
+
+
+def iter_ids(start_id, step=1, block_size=ID_BLOCK_SIZE):
+    """Yield start_id and every following ID indefinitely, allocated in blocks."""
+    allocator = IDAllocator(start_id, step)
+    while True:
+        yield from allocator.allocate(block_size)
+
+
+def iter_value_rows(filename):
+    """Yield one {field name: value} dict per row of a CSV (with header) or JSONL file."""
+    if filename == '-':
+        stream = sys.stdin
+        is_jsonl = False
+    else:
+        stream = open(filename, 'r', encoding='utf-8', newline='')
+        is_jsonl = filename.lower().endswith(('.jsonl', '.ndjson'))
+
+    try:
+        if is_jsonl:
+            for line_number, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError(f"Line {line_number}: expected a JSON object")
+                yield row
+        else:
+            yield from csv.DictReader(stream)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def iter_batch_records(field_names, id_name, start_id, count=None, value_rows=None, keep_empty=False, step=1):
+    """Yield Records for consecutive IDs, filling template fields from value_rows.
+
+    Rows that give an empty record are skipped without using up an ID.
+    """
+    if value_rows is None:
+        value_rows = itertools.repeat({})
+    if count is not None:
+        value_rows = itertools.islice(value_rows, count)
+
+    ids = iter_ids(start_id, step)
+    current_id = next(ids)
+    for row in value_rows:
+        fields = ((name, _cell(row.get(name))) for name in field_names)
+        record = build_record(id_name, current_id, fields, keep_empty=keep_empty)
+        if record:
+            yield Record(*record)
+            current_id = next(ids)
+
+
+def iter_rows(records, layout=LAYOUT_RECORDS, columns=None):
+    """Yield the CSV rows of each record as a tuple, one tuple per record."""
+    if layout == LAYOUT_UNIFIED:
+        return iter_unified_rows(records, columns)
+    return ((record.field_names, record.values) for record in records)
+
+
+def write_records(records, output, layout=LAYOUT_RECORDS, columns=None, csv_format=DEFAULT_FORMAT):
+    """Stream records to output ('-' for stdout) and return how many were written.
+
+    Like the app, the output's extension picks CSV or JSON Lines (either may
+    be compressed); SQLite output is not streamed, so it is refused.
+    """
+    if output == '-':
+        written = write_record_rows(sys.stdout, iter_rows(records, layout, columns), csv_format)
+        sys.stdout.flush()
+        return written
+
+    kind = output_kind(output)
+    if kind not in (KIND_CSV, KIND_JSONL):
+        raise ValueError(f"Batch output must be CSV or JSON Lines, not {kind}: {output}")
+
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    if kind == KIND_JSONL:
+        # Every line names its fields, so the layout does not apply; JSON Lines is always UTF-8
+        with DEFAULT_FORMAT.open(output, compression=compression_for(output)) as f:
+            return write_jsonl(f, records)
+    with csv_format.open(output, compression=compression_for(output)) as f:
+        return write_record_rows(f, iter_rows(records, layout, columns), csv_format)
+
+
+def build_parser():
+    """Create the argument parser for the batch command."""
+    parser = argparse.ArgumentParser(
+        prog="csv_populator.py batch",
+        description="Generate CSV Populator records without the GUI."
+    )
+    parser.add_argument('--template', required=True, help="JSON template file (same formats as Load Template)")
+    parser.add_argument('--id-name', required=True, help="Name of the ID column")
+    parser.add_argument('--start-id', required=True, help="First ID, e.g. 100 or WO100")
+    parser.add_argument('--step', type=int, default=1, help="Amount added to the ID number per record (default: 1)")
+    parser.add_argument('--count', type=int, help="Number of records to generate (default: one per values row)")
+    parser.add_argument('--values', help="CSV (with header) or JSONL file of field values, '-' for stdin CSV")
+    parser.add_argument('--output', default='-', help="Output path: CSV, or JSON Lines for .jsonl/.ndjson, compressed if it ends in .gz or .xz (default: CSV to stdout)")
+    parser.add_argument('--keep-empty', action='store_true', help="Write template fields that have no value")
+    parser.add_argument(
+        '--layout',
+        choices=[LAYOUT_RECORDS, LAYOUT_UNIFIED],
+        default=LAYOUT_RECORDS,
+        help="'records' writes a header before every record; 'unified' writes one header and a rectangular table"
+    )
+    add_format_arguments(parser)
+    return parser
+
+
+def main(argv=None):
+    """Entry point for ``python csv_populator.py batch``."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.values is None and args.count is None:
+        parser.error("--count is required when no --values source is given")
+    if args.values is None and not args.keep_empty:
+        parser.error("without --values every field is empty; pass --keep-empty to write blank fields")
+    if args.count is not None and args.count < 0:
+        parser.error("--count must not be negative")
+    if args.step < 1:
+        parser.error("--step must be at least 1")
+
+    try:
+        csv_format = format_from_args(args)
+        field_names = [name for name in read_template(args.template) if name]
+        if not field_names:
+            raise ValueError("No valid field names found in template")
+
+        value_rows = iter_value_rows(args.values) if args.values else None
+        records = iter_batch_records(
+            field_names,
+            args.id_name,
+            args.start_id,
+            count=args.count,
+            value_rows=value_rows,
+            keep_empty=args.keep_empty,
+            step=args.step
+        )
+        columns = [args.id_name] + field_names
+        written = write_records(records, args.output, args.layout, columns, csv_format)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.output != '-':
+        print(f"Wrote {written} records to: {os.path.abspath(args.output)}", file=sys.stderr)
+    return 0
+
+
+def _cell(value):
+    """Normalise a value from the values source to a stripped string."""
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
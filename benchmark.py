@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the CSV Populator hot UI paths.
+
+Drives a real CSVPopulatorApp (under Xvfb when no display is available) and
+prints timings as JSON:
+
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json      # exit 1 on regressions
+
+Start-up is measured in fresh processes (time to first paint and to an
+interactive window) and checked against --startup-budget-ms.  Export
+throughput of the csv.writer engine is compared with the old ','.join
+formatting, which it must not fall behind, and Resume must read back the
+last record of files written in every layout.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from csv_export import (
+    DEFAULT_FORMAT,
+    LAYOUT_GROUPED,
+    LAYOUT_RECORDS,
+    LAYOUT_UNIFIED,
+    WRITE_CHUNK_RECORDS,
+    DeltaCSVWriter,
+    iter_layout_blocks,
+    write_row_blocks
+)
+from field_grid import VALUE
+from record_store import RecordStore
+from resume import read_resume_point
+
+
+RECORD_SCALES = [100, 1000, 10000, 50000]
+EXPORT_SCALES = [10000, 100000, 500000]
+EXPORT_SAMPLES = 5
+EXPORT_TOLERANCE = 1.1
+FIELD_SCALES = [10, 100, 1000]
+SAMPLES = 50
+DEFAULT_THRESHOLD = 1.25
+STARTUP_SAMPLES = 5
+DEFAULT_STARTUP_BUDGET_MS = 1500
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "csv_populator.py")
+
+
+def start_virtual_display():
+    """Start Xvfb if there is no display; return the process (or None)."""
+    if os.environ.get("DISPLAY") or sys.platform == "win32":
+        return None
+
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        raise RuntimeError("No DISPLAY and Xvfb not found; install Xvfb or run under a display")
+
+    display = f":{90 + os.getpid() % 100}"
+    process = subprocess.Popen(
+        [xvfb, display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    os.environ["DISPLAY"] = display
+    time.sleep(0.5)
+    return process
+
+
+def summarize(samples):
+    """Reduce a list of seconds to millisecond statistics."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "mean_ms": statistics.mean(ordered) * 1000,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": p95 * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "samples": len(ordered)
+    }
+
+
+class Bench:
+    """Builds a fresh application per scenario and measures its handlers."""
+
+    def __init__(self, workdir):
+        import tkinter as tk
+        from tkinter import filedialog
+
+        self.tk = tk
+        self.filedialog = filedialog
+        self.workdir = workdir
+
+    def make_app(self):
+        """Create a mapped CSVPopulatorApp."""
+        from csv_populator import CSVPopulatorApp
+
+        root = self.tk.Tk()
+        app = CSVPopulatorApp(root)
+        app.filename_entry.delete(0, self.tk.END)
+        app.filename_entry.insert(0, os.path.join(self.workdir, "bench_output.csv"))
+        root.update()
+        return root, app
+
+    def close_app(self, root, app):
+        """Tear an application down, letting its save worker finish."""
+        app.save_worker.close()
+        root.destroy()
+
+    def load_fields(self, app, count):
+        """Load a template with count fields through _load_template."""
+        path = self.write_template(count)
+        self.filedialog.askopenfilename = lambda **kwargs: path
+        start = time.perf_counter()
+        app._load_template()
+        app.root.update()
+        return time.perf_counter() - start
+
+    def write_template(self, count):
+        """Write a template JSON with count fields and return its path."""
+        path = os.path.join(self.workdir, f"template_{count}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"fields": [f"field_{i}" for i in range(count)]}, f)
+        return path
+
+    def fill_values(self, app):
+        """Give every field a value and set up the ID entries."""
+        app.starting_id_name_entry.delete(0, self.tk.END)
+        app.starting_id_name_entry.insert(0, "ID")
+        app.starting_id_number_entry.delete(0, self.tk.END)
+        app.starting_id_number_entry.insert(0, "1")
+        for index in range(len(app.fields)):
+            app.fields.set(index, VALUE, f"v{index}")
+
+    def prefill_records(self, app, count):
+        """Put count records into the session without going through the UI."""
+        field_names = ["ID"] + [f"field_{i}" for i in range(10)]
+        for i in range(count):
+            app.all_records.append(field_names, [str(i)] + [f"v{j}" for j in range(10)])
+        app._update_csv_preview()
+
+    def bench_new_id(self, records):
+        """Latency of _new_id with records already in the session."""
+        root, app = self.make_app()
+        try:
+            self.load_fields(app, 10)
+            self.prefill_records(app, records)
+            samples = []
+            for _ in range(SAMPLES):
+                self.fill_values(app)
+                start = time.perf_counter()
+                app._new_id()
+                root.update()
+                samples.append(time.perf_counter() - start)
+            return summarize(samples)
+        finally:
+            self.close_app(root, app)
+
+    def bench_save(self, records):
+        """Time from Save to CSV until the file is fully written."""
+        root, app = self.make_app()
+        try:
+            self.load_fields(app, 10)
+            self.prefill_records(app, records)
+            samples = []
+            submit_samples = []
+            for _ in range(5):
+                app._reset_saved_state()
+                start = time.perf_counter()
+                app._save_to_csv()
+                submit_samples.append(time.perf_counter() - start)
+                while app.save_worker.busy:
+                    root.update()
+                    time.sleep(0.001)
+                root.update()
+                samples.append(time.perf_counter() - start)
+            result = summarize(samples)
+            result["ui_blocked_ms"] = max(submit_samples) * 1000
+            return result
+        finally:
+            self.close_app(root, app)
+
+    def bench_load_template(self, fields):
+        """Time _load_template for a template with fields entries."""
+        root, app = self.make_app()
+        try:
+            return summarize([self.load_fields(app, fields) for _ in range(5)])
+        finally:
+            self.close_app(root, app)
+
+    def bench_handle_tab(self, fields):
+        """Latency of _handle_tab walking through fields rows."""
+        root, app = self.make_app()
+        try:
+            self.load_fields(app, fields)
+            samples = []
+            index, role = 0, VALUE
+            for _ in range(SAMPLES):
+                app.field_grid.focus_cell(index, role)
+                root.update()
+                # focus_lastfor works even when the window manager has not focused the app
+                event = SimpleNamespace(widget=root.focus_lastfor())
+                start = time.perf_counter()
+                app._handle_tab(event)
+                root.update()
+                samples.append(time.perf_counter() - start)
+                cell = app.field_grid.cell_of(root.focus_lastfor())
+                index, role = cell if cell else (0, VALUE)
+            return summarize(samples)
+        finally:
+            self.close_app(root, app)
+
+    def bench_memory(self, records, fields):
+        """Peak Python memory for a session of records plus a fields template and a save."""
+        root, app = self.make_app()
+        try:
+            tracemalloc.start()
+            self.load_fields(app, fields)
+            self.prefill_records(app, records)
+            app._save_to_csv()
+            while app.save_worker.busy:
+                root.update()
+                time.sleep(0.001)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return {"records": records, "fields": fields, "peak_traced_mb": peak / 2**20}
+        finally:
+            self.close_app(root, app)
+
+
+def bench_startup(workdir, samples=STARTUP_SAMPLES):
+    """Launch the app in fresh processes and collect its start-up milestones."""
+    report_path = os.path.join(workdir, "startup.json")
+    milestones = {}
+    process_samples = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, APP_SCRIPT, "--startup-report", report_path, "--quit-after-startup"],
+            check=True,
+            timeout=60
+        )
+        process_samples.append(time.perf_counter() - start)
+        with open(report_path, "r", encoding="utf-8") as f:
+            for name, ms in json.load(f).items():
+                milestones.setdefault(name, []).append(ms / 1000)
+
+    results = {name: summarize(values) for name, values in milestones.items()}
+    results["process_total"] = summarize(process_samples)
+    return results
+
+
+def join_export(records, path):
+    """The export path before csv.writer: unquoted ','.join lines built into strings."""
+    with open(path, "w", encoding="utf-8") as f:
+        for start in range(0, len(records), WRITE_CHUNK_RECORDS):
+            chunk = records[start:start + WRITE_CHUNK_RECORDS]
+            f.write("".join(",".join(r.field_names) + "\n" + ",".join(r.values) + "\n" for r in chunk))
+
+
+def engine_export(records, path):
+    """The csv.writer export engine, as used by the save worker."""
+    with DEFAULT_FORMAT.open(path) as f:
+        write_row_blocks(f, iter_layout_blocks(records, LAYOUT_RECORDS), DEFAULT_FORMAT)
+
+
+def bench_export(workdir, records, samples=EXPORT_SAMPLES):
+    """Throughput of the csv.writer engine against the old join path for a session of records."""
+    store = RecordStore()
+    field_names = ["ID"] + [f"field_{i}" for i in range(10)]
+    for i in range(records):
+        store.append(field_names, [str(i)] + [f"value {j} of record {i}" for j in range(10)])
+    snapshot = store.snapshot()
+
+    path = os.path.join(workdir, "export.csv")
+    timings = {"engine": [], "join": []}
+    for _ in range(samples):
+        for name, export in (("engine", engine_export), ("join", join_export)):
+            start = time.perf_counter()
+            export(snapshot, path)
+            timings[name].append(time.perf_counter() - start)
+    size = os.path.getsize(path)
+
+    result = summarize(timings["engine"])
+    join_p50 = statistics.median(timings["join"])
+    result["join_p50_ms"] = join_p50 * 1000
+    result["vs_join"] = result["p50_ms"] / result["join_p50_ms"]
+    result["records_per_second"] = records / (result["p50_ms"] / 1000)
+    result["mb_per_second"] = size / 2**20 / (result["p50_ms"] / 1000)
+    return result
+
+
+def check_export_speed(report):
+    """Return failure messages where the export engine is slower than the old join path."""
+    failures = []
+    for scale, result in report["results"].get("export", {}).items():
+        if result["vs_join"] > EXPORT_TOLERANCE:
+            failures.append(
+                f"export[{scale}]: p50 {result['p50_ms']:.1f} ms vs {result['join_p50_ms']:.1f} ms for the join path"
+            )
+    return failures
+
+
+def check_resume(workdir):
+    """Return failure messages where Resume misreads a file the writer produced.
+
+    The last record holds a quoted line break, as multi-line values are written.
+    """
+    records = RecordStore()
+    records.append(("ID", "Name"), ["1", "plain"])
+    records.append(("ID", "Name"), ["2", "plain"])
+    records.append(("ID", "Name", "Notes"), ["3", "x", "multi\nline"])
+    failures = []
+    for layout in (LAYOUT_RECORDS, LAYOUT_GROUPED, LAYOUT_UNIFIED):
+        path = os.path.join(workdir, f"resume_{layout}.csv")
+        DeltaCSVWriter().save(path, records, layout=layout)
+        point = read_resume_point(path)
+        if point is None or point.last_id != "3" or point.layout != layout:
+            failures.append(f"resume[{layout}]: read {point}")
+    return failures
+
+
+def slowest_imports(limit=10):
+    """Run the app's imports under -X importtime and return the costliest modules."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import csv_populator"],
+        cwd=os.path.dirname(APP_SCRIPT),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    imports = []
+    for line in completed.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            imports.append({"module": parts[2].strip(), "cumulative_ms": int(parts[1]) / 1000})
+    imports.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+    return imports[:limit]
+
+
+def run(args):
+    """Run every scenario and return the results dictionary."""
+    results = {"new_id": {}, "save_to_csv": {}, "load_template": {}, "handle_tab": {}}
+    with tempfile.TemporaryDirectory() as workdir:
+        bench = Bench(workdir)
+        for records in args.records:
+            results["new_id"][str(records)] = bench.bench_new_id(records)
+            results["save_to_csv"][str(records)] = bench.bench_save(records)
+        for fields in args.fields:
+            results["load_template"][str(fields)] = bench.bench_load_template(fields)
+            results["handle_tab"][str(fields)] = bench.bench_handle_tab(fields)
+        results["memory"] = bench.bench_memory(max(args.records), max(args.fields))
+        results["startup"] = bench_startup(workdir)
+        results["export"] = {str(records): bench_export(workdir, records) for records in args.export_records}
+    results["startup_imports"] = slowest_imports()
+
+    if resource:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != "darwin":
+            max_rss *= 1024
+        results["memory"]["max_rss_mb"] = max_rss / 2**20
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "results": results
+    }
+
+
+def compare(report, baseline, threshold):
+    """Return regressions where p50 latency or peak memory grew beyond threshold x baseline."""
+    regressions = []
+    memory = report["results"].get("memory", {})
+    previous_memory = baseline.get("results", {}).get("memory", {})
+    if memory.get("peak_traced_mb") and previous_memory.get("peak_traced_mb"):
+        ratio = memory["peak_traced_mb"] / previous_memory["peak_traced_mb"]
+        memory["baseline_ratio"] = ratio
+        if ratio > threshold:
+            regressions.append(f"memory: peak {memory['peak_traced_mb']:.1f} MB vs {previous_memory['peak_traced_mb']:.1f} MB ({ratio:.2f}x)")
+
+    for name, scales in report["results"].items():
+        if name in ("memory", "startup_imports"):
+            continue
+        for scale, current in scales.items():
+            previous = baseline.get("results", {}).get(name, {}).get(scale)
+            if not previous or not previous.get("p50_ms"):
+                continue
+            ratio = current["p50_ms"] / previous["p50_ms"]
+            current["baseline_ratio"] = ratio
+            if ratio > threshold:
+                regressions.append(f"{name}[{scale}]: p50 {current['p50_ms']:.2f} ms vs {previous['p50_ms']:.2f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def check_startup_budget(report, budget_ms):
+    """Return a failure message if the median time to interactive exceeds budget_ms."""
+    interactive = report["results"].get("startup", {}).get("interactive")
+    if interactive and interactive["p50_ms"] > budget_ms:
+        return f"startup: interactive after {interactive['p50_ms']:.0f} ms, budget {budget_ms:.0f} ms"
+    return None
+
+
+def main(argv=None):
+    """Entry point: run benchmarks, print JSON, compare with a baseline."""
+    parser = argparse.ArgumentParser(description="Benchmark CSV Populator hot paths.")
+    parser.add_argument("--records", type=int, nargs="+", default=RECORD_SCALES, help="Session sizes for New ID / Save")
+    parser.add_argument("--fields", type=int, nargs="+", default=FIELD_SCALES, help="Template sizes for load / Tab")
+    parser.add_argument(
+        "--export-records",
+        type=int,
+        nargs="+",
+        default=EXPORT_SCALES,
+        help="Session sizes for export throughput"
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON report")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed p50 slowdown ratio")
+    parser.add_argument(
+        "--startup-budget-ms",
+        type=float,
+        default=DEFAULT_STARTUP_BUDGET_MS,
+        help="Fail when the median time to an interactive window exceeds this"
+    )
+    args = parser.parse_args(argv)
+
+    display = start_virtual_display()
+    try:
+        report = run(args)
+    finally:
+        if display:
+            display.terminate()
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+    over_budget = check_startup_budget(report, args.startup_budget_ms)
+    if over_budget:
+        regressions.append(over_budget)
+    regressions.extend(check_export_speed(report))
+    with tempfile.TemporaryDirectory() as workdir:
+        regressions.extend(check_resume(workdir))
+    if regressions or args.baseline:
+        report["regressions"] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
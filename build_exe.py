@@ -3,11 +3,41 @@
 Build script to create a standalone Windows executable for CSV Populator
 """
 
+import argparse
 import os
 import subprocess
 import sys
 
-def build_executable():
+# Standard library packages the app never imports; leaving them out shrinks
+# the bundle and the archive PyInstaller has to open at start-up
+EXCLUDED_MODULES = [
+    "asyncio",
+    "concurrent",
+    "multiprocessing",
+    "unittest",
+    "doctest",
+    "pydoc",
+    "pdb",
+    "lib2to3",
+    "distutils",
+    "setuptools",
+    "ensurepip",
+    "venv",
+    "test",
+    "tkinter.test",
+    "idlelib",
+    "turtle",
+    "turtledemo",
+    "xmlrpc",
+    "http",
+    "ftplib",
+    "smtplib",
+    "imaplib",
+    "poplib",
+    "ssl"
+]
+
+def build_executable(onedir=False):
     """Build the standalone executable using PyInstaller"""
     
     print("Building standalone Windows executable...")
@@ -15,14 +45,18 @@ def build_executable():
     # PyInstaller command with optimized settings
     cmd = [
         "pyinstaller",
-        "--onefile",                    # Single executable file
+        "--onedir" if onedir else "--onefile",  # Folder build starts without unpacking to a temp dir
         "--windowed",                   # No console window (Windows)
         "--name=CSV_Populator",         # Executable name
         "--add-data=README.md;.",       # Include README if it exists
         "--clean",                      # Clean cache
         "--noconfirm",                  # Overwrite output directory
-        "csv_populator.py"
     ]
+    cmd += [f"--exclude-module={module}" for module in EXCLUDED_MODULES]
+    if onedir:
+        # UPX-packed DLLs have to be decompressed on every launch
+        cmd.append("--noupx")
+    cmd.append("csv_populator.py")
     
     # Remove README flag if it doesn't exist
     if not os.path.exists("README.md"):
@@ -33,11 +67,18 @@ def build_executable():
         # Run PyInstaller
         result = subprocess.run(cmd, check=True, capture_output=True, text=True)
         print("Build completed successfully!")
-        print(f"Executable created in: dist/CSV_Populator.exe")
+        exe_path = "dist/CSV_Populator/CSV_Populator.exe" if onedir else "dist/CSV_Populator.exe"
+        print(f"Executable created in: {exe_path}")
         
         # Show file size
-        exe_path = "dist/CSV_Populator.exe"
-        if os.path.exists(exe_path):
+        if onedir and os.path.isdir("dist/CSV_Populator"):
+            size_mb = sum(
+                os.path.getsize(os.path.join(folder, name))
+                for folder, _, names in os.walk("dist/CSV_Populator")
+                for name in names
+            ) / (1024 * 1024)
+            print(f"Folder size: {size_mb:.1f} MB (ship the whole dist/CSV_Populator folder)")
+        elif os.path.exists(exe_path):
             size_mb = os.path.getsize(exe_path) / (1024 * 1024)
             print(f"File size: {size_mb:.1f} MB")
         
@@ -64,6 +105,14 @@ def install_dependencies():
         return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the CSV Populator executable")
+    parser.add_argument(
+        "--onedir",
+        action="store_true",
+        help="Build a folder instead of a single file; starts faster on slow PCs"
+    )
+    args = parser.parse_args()
+    
     print("CSV Populator - Executable Builder")
     print("=" * 40)
     
@@ -77,7 +126,7 @@ if __name__ == "__main__":
             sys.exit(1)
     
     # Build the executable
-    if build_executable():
+    if build_executable(onedir=args.onedir):
         print("\nBuild completed successfully!")
         print("Your users can now run CSV_Populator.exe without Python installed!")
     else:
@@ -0,0 +1,579 @@
+import csv
+import hashlib
+import io
+import os
+from collections import namedtuple
+from itertools import chain, islice
+
+
+# Records handed to the csv writer per writerows() call, and the file buffer size
+WRITE_CHUNK_RECORDS = 10000
+WRITE_BUFFER_BYTES = 1 << 20
+
+
+# Export layouts: a header before every record, one header per distinct
+# field-name schema, or one rectangular table over the union of all columns
+LAYOUT_RECORDS = 'records'
+LAYOUT_GROUPED = 'grouped'
+LAYOUT_UNIFIED = 'unified'
+
+
+# Compressed output is chosen by the file extension.  Both formats can be
+# appended to: each save adds a stream, and readers decode the concatenation
+COMPRESSIONS = {'.gz': 'gzip', '.xz': 'lzma'}
+COMPRESSION_LEVELS = {'gzip': 6, 'lzma': 3}
+
+
+# The process umask, read once at import (on the main thread): os.umask() can
+# only be read by setting it, which must not happen while other threads create files
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+# What a save wrote: bytes before compression (None if not a text stream) and bytes added to the file
+OutputStats = namedtuple('OutputStats', ['data_bytes', 'disk_bytes'])
+
+
+# Text encodings offered for export; utf-8-sig starts the file with a BOM so Excel reads it as UTF-8
+ENCODINGS = ('utf-8', 'utf-8-sig', 'cp1252', 'latin-1')
+LINE_TERMINATORS = {'lf': '\n', 'crlf': '\r\n'}
+
+
+class CSVFormat:
+    """How records are encoded: a csv module dialect, its overrides and the text encoding.
+
+    Files are written through csv.writer, so values holding the delimiter,
+    quotes or line breaks are quoted.  The default is the excel dialect with
+    '\n' line endings, matching files written by earlier versions.
+
+    join_rows() is the fast path for the common case: with minimal quoting,
+    a block of rows in which no value holds a special character is plain
+    delimiter-joined text.  That is checked on the joined block with a few
+    C-level counts, and csv.writer handles any block that fails the check.
+    """
+
+    def __init__(self, dialect='excel', delimiter=None, lineterminator='\n', quoting=None, encoding='utf-8'):
+        self.dialect = dialect
+        self.fmtparams = {}
+        for name, value in (('delimiter', delimiter), ('lineterminator', lineterminator), ('quoting', quoting)):
+            if value is not None:
+                self.fmtparams[name] = value
+        self.encoding = encoding
+
+        # Fail on a bad dialect or encoding now rather than halfway through a save
+        try:
+            self._line_buffer = io.StringIO()
+            self._line_writer = csv.writer(self._line_buffer, dialect, **self.fmtparams)
+            ''.encode(encoding)
+        except (csv.Error, TypeError, LookupError) as e:
+            raise ValueError(f"Invalid CSV format: {e}")
+
+        dialect = self._line_writer.dialect
+        self._joinable = dialect.quoting == csv.QUOTE_MINIMAL
+        self._separator = dialect.delimiter
+        self._terminator = dialect.lineterminator
+        # Characters that make csv.writer quote or escape a value, and how often each may appear per row
+        self._specials = [c for c in (dialect.quotechar, dialect.escapechar) if c]
+        self._line_chars = [(c, dialect.lineterminator.count(c)) for c in set('\r\n' + dialect.lineterminator)]
+
+    @property
+    def delimiter(self):
+        """The field delimiter in effect."""
+        return self._line_writer.dialect.delimiter
+
+    @property
+    def quotechar(self):
+        """The quote character in effect (None if values are never quoted)."""
+        return self._line_writer.dialect.quotechar
+
+    def writer(self, f):
+        """Return a csv.writer over the text file f."""
+        return csv.writer(f, self.dialect, **self.fmtparams)
+
+    def open(self, file, mode='w', compression=None, sync=False):
+        """Open a path or file descriptor for writing with this encoding (see OutputFile)."""
+        return OutputFile(file, mode, self.encoding, compression, sync)
+
+    def format_line(self, values):
+        """Format one row as text without its line terminator (for display)."""
+        self._line_buffer.seek(0)
+        self._line_buffer.truncate()
+        self._line_writer.writerow(values)
+        return self._line_buffer.getvalue().rstrip('\r\n')
+
+    def join_rows(self, rows):
+        """Return rows as CSV text if no value needs quoting, else None (use writer() instead)."""
+        if not self._joinable or not rows:
+            return None
+        separator = self._separator
+        terminator = self._terminator
+        try:
+            text = terminator.join(map(separator.join, rows)) + terminator
+        except TypeError:  # a non-string value
+            return None
+
+        # Rows of one field need csv.writer, which quotes a lone empty value
+        if min(map(len, rows)) < 2:
+            return None
+        count = len(rows)
+        fields = sum(map(len, rows))
+        if text.count(separator) != fields - count:
+            return None
+        for char in self._specials:
+            if char in text:
+                return None
+        for char, per_row in self._line_chars:
+            if text.count(char) != count * per_row:
+                return None
+        return text
+
+    def reader(self, lines):
+        """Return a csv.reader over an iterable of text lines."""
+        return csv.reader(lines, self.dialect, **{k: v for k, v in self.fmtparams.items() if k != 'lineterminator'})
+
+
+DEFAULT_FORMAT = CSVFormat()
+
+
+def compression_for(path):
+    """Name of the compression module selected by path's extension, or None."""
+    extension = os.path.splitext(path)[1].lower()
+    return COMPRESSIONS.get(extension)
+
+
+class OutputFile:
+    """Text output to a path or file descriptor, optionally compressed, that counts its bytes.
+
+    Use it as a context manager; the block gets the text file.  With
+    compression ('gzip' or 'lzma') the text is compressed as the 1 MB file
+    buffer fills, so memory stays flat however much is written.  Closing
+    ends the compressed stream before the file is flushed (and synced, if
+    sync is set), then ``stats`` holds an OutputStats for what was written.
+    """
+
+    def __init__(self, file, mode='w', encoding='utf-8', compression=None, sync=False):
+        self.sync = sync
+        self.stats = None
+        self.raw = open(file, mode + 'b', buffering=WRITE_BUFFER_BYTES)
+        self.start = self.raw.tell()
+        if self.start and encoding == 'utf-8-sig':
+            # Only the start of the file gets a BOM, also inside a compressed stream
+            encoding = 'utf-8'
+
+        try:
+            if compression is None:
+                self.stream = self.raw
+            else:
+                # Imported on demand, but by name so that PyInstaller bundles them;
+                # the file object is left open for us to sync
+                level = COMPRESSION_LEVELS[compression]
+                if compression == 'gzip':
+                    import gzip
+                    self.stream = gzip.GzipFile(fileobj=self.raw, mode='wb', compresslevel=level, mtime=0)
+                else:
+                    import lzma
+                    self.stream = lzma.LZMAFile(self.raw, mode='wb', preset=level)
+            self.text = io.TextIOWrapper(self.stream, encoding=encoding, newline='')
+        except BaseException:
+            self.raw.close()
+            raise
+
+    def __enter__(self):
+        return self.text
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.raw.close()
+        return False
+
+    def close(self):
+        """Finish the stream, flush (and sync) the file and record the stats."""
+        if self.raw.closed:
+            return
+        self.text.flush()
+        stream = self.text.detach()
+        data_bytes = stream.tell() - (self.start if stream is self.raw else 0)
+        if stream is not self.raw:
+            stream.close()
+        self.raw.flush()
+        if self.sync:
+            os.fsync(self.raw.fileno())
+        self.stats = OutputStats(data_bytes, self.raw.tell() - self.start)
+        self.raw.close()
+
+
+def add_format_arguments(parser):
+    """Add the export format options shared by the app and the batch command."""
+    parser.add_argument('--csv-dialect', default='excel', choices=csv.list_dialects(), help="csv module dialect (default: excel)")
+    parser.add_argument('--delimiter', help="Field delimiter, e.g. ';' or 'tab' (default: the dialect's)")
+    parser.add_argument(
+        '--line-terminator',
+        choices=sorted(LINE_TERMINATORS),
+        default='lf',
+        help="Line endings (default: lf)"
+    )
+    parser.add_argument(
+        '--encoding',
+        choices=ENCODINGS,
+        default='utf-8',
+        help="Text encoding; utf-8-sig adds a BOM so Excel detects UTF-8 (default: utf-8)"
+    )
+
+
+def format_from_args(args):
+    """Build the CSVFormat selected by add_format_arguments options."""
+    delimiter = '\t' if args.delimiter == 'tab' else args.delimiter
+    return CSVFormat(args.csv_dialect, delimiter, LINE_TERMINATORS[args.line_terminator], encoding=args.encoding)
+
+
+def iter_records(records, start=0, stop=None, chunk_records=WRITE_CHUNK_RECORDS):
+    """Yield records[start:stop] while fetching only one chunk at a time."""
+    stop = len(records) if stop is None else stop
+    for chunk_start in range(start, stop, chunk_records):
+        yield from records[chunk_start:min(chunk_start + chunk_records, stop)]
+
+
+def record_digest(field_names, values):
+    """128-bit fingerprint of a record's field names and values."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('\x1f'.join(field_names).encode('utf-8'))
+    digest.update(b'\x1e')
+    digest.update('\x1f'.join(values).encode('utf-8'))
+    return digest.digest()
+
+
+def iter_file_digests(path, layout=LAYOUT_RECORDS, csv_format=DEFAULT_FORMAT):
+    """Yield the record_digest of every record in an output CSV written with layout.
+
+    A row whose first cell is the ID name of the first header starts a new
+    header.  In the unified layout empty cells are dropped, giving back the
+    fields of records saved without empty values.
+    """
+    encoding = 'utf-8-sig' if csv_format.encoding.startswith('utf-8') else csv_format.encoding
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        header = None
+        for row in csv_format.reader(f):
+            if not row:
+                continue
+            if header is None or row[0] == header[0]:
+                header = row
+            elif layout == LAYOUT_UNIFIED:
+                cells = [(name, value) for name, value in zip(header, row) if value]
+                yield record_digest([name for name, value in cells], [value for name, value in cells])
+            else:
+                yield record_digest(header[:len(row)], row)
+
+
+def iter_unique(records, seen):
+    """Yield records whose digest is not in seen yet, adding each one to it."""
+    for record in records:
+        digest = record_digest(record.field_names, record.values)
+        if digest not in seen:
+            seen.add(digest)
+            yield record
+
+
+def unified_columns(records):
+    """Union of field names over all schemas, in first-seen order."""
+    columns = {}
+    for schema_id, field_names in records.schemas():
+        for field_name in field_names:
+            columns.setdefault(field_name, None)
+    return list(columns)
+
+
+def iter_unified_rows(records, columns, include_header=True):
+    """Yield the rows of each record as one rectangular row over columns, blank where a field is missing.
+
+    The first record's rows start with the header if include_header is set.
+    """
+    column_index = {name: i for i, name in enumerate(columns)}
+    positions = {}
+    for record in records:
+        field_names = tuple(record.field_names)
+        slots = positions.get(field_names)
+        if slots is None:
+            slots = positions[field_names] = [column_index[name] for name in field_names]
+        row = [''] * len(columns)
+        for slot, value in zip(slots, record.values):
+            row[slot] = value
+        if include_header:
+            include_header = False
+            yield (columns, row)
+        else:
+            yield (row,)
+
+
+def iter_layout_rows(records, layout, start=0, columns=None, new_file=None, seen=None):
+    """Yield a tuple of CSV rows per record from start on, with headers as the layout requires.
+
+    In the grouped layout start must be 0, since every group is rewritten.
+    new_file says whether the unified header is needed; by default only when
+    writing from the first record.  If seen is a set of record digests,
+    records already in it are skipped (see iter_unique).
+    """
+    new_file = start == 0 if new_file is None else new_file
+    selected = iter_records(records, start)
+    if seen is not None:
+        selected = iter_unique(selected, seen)
+
+    if layout == LAYOUT_RECORDS:
+        # A Record is already the (header, values) pair of rows
+        yield from selected
+
+    elif layout == LAYOUT_GROUPED:
+        for schema_id, field_names in records.schemas():
+            first = True
+            for values in records.rows(schema_id):
+                if seen is not None:
+                    digest = record_digest(field_names, values)
+                    if digest in seen:
+                        continue
+                    seen.add(digest)
+                if first:
+                    first = False
+                    yield (field_names, values)
+                else:
+                    yield (values,)
+
+    elif layout == LAYOUT_UNIFIED:
+        columns = columns if columns is not None else unified_columns(records)
+        yield from iter_unified_rows(selected, columns, include_header=new_file)
+
+    else:
+        raise ValueError(f"Unknown export layout: {layout}")
+
+
+def iter_row_blocks(record_rows, chunk_records=WRITE_CHUNK_RECORDS):
+    """Group per-record row tuples into (record count, rows) blocks of up to chunk_records records."""
+    while True:
+        chunk = list(islice(record_rows, chunk_records))
+        if not chunk:
+            return
+        yield len(chunk), list(chain.from_iterable(chunk))
+
+
+def iter_layout_blocks(records, layout, start=0, columns=None, new_file=None, seen=None):
+    """Yield (record count, rows) blocks of records from start on, as iter_layout_rows lays them out.
+
+    The header-per-record layout is the common case and takes a fast path:
+    each run of records sharing a schema comes from records.runs() as value
+    rows, and the header is interleaved with them by slice assignment, so no
+    record is rebuilt or copied on its own.
+    """
+    if layout != LAYOUT_RECORDS or seen is not None:
+        yield from iter_row_blocks(iter_layout_rows(records, layout, start, columns, new_file, seen))
+        return
+
+    stop = len(records)
+    for chunk_start in range(start, stop, WRITE_CHUNK_RECORDS):
+        for field_names, values in records.runs(chunk_start, min(chunk_start + WRITE_CHUNK_RECORDS, stop)):
+            rows = [field_names] * (2 * len(values))
+            rows[1::2] = values
+            yield len(values), rows
+
+
+def write_row_blocks(f, blocks, csv_format=DEFAULT_FORMAT, total=None, progress=None):
+    """Write (record count, rows) blocks to the text file f; return the number of records.
+
+    Each block is one write: joined text when no value needs quoting, else
+    a single writer.writerows() call.  progress, if given, is called as
+    progress(done, total) after each block.
+    """
+    writer = csv_format.writer(f)
+    done = 0
+    for count, rows in blocks:
+        text = csv_format.join_rows(rows)
+        if text is None:
+            writer.writerows(rows)
+        else:
+            f.write(text)
+        done += count
+        if progress:
+            progress(done, total)
+    return done
+
+
+def write_record_rows(f, record_rows, csv_format=DEFAULT_FORMAT, total=None, progress=None):
+    """Write per-record row tuples to the text file f in chunks; return the number of records."""
+    return write_row_blocks(f, iter_row_blocks(record_rows), csv_format, total, progress)
+
+
+class DeltaCSVWriter:
+    """Write session records to CSV, appending only records added since the last save.
+
+    The writer remembers how many records are already on disk (the high-water
+    mark), the layout and columns it used and the size/mtime it left the file
+    with.  A save appends the new records when that state still matches;
+    otherwise it rewrites the whole file atomically through a temporary file.
+    The grouped layout can only be rewritten, and the unified layout appends
+    only while no new columns have appeared.
+
+    With dedupe, records identical to one already in the file are skipped.
+    A set of 128-bit digests of the written records is kept between saves,
+    so the check stays a single streaming pass over the new records; for a
+    resumed file it is seeded once from the records already on disk.  (The
+    app's Bloom-filter ID index only warns about duplicate IDs; dedupe
+    compares whole records, and a Bloom filter's false positives would drop
+    records that were never written.)
+
+    Rows are encoded by csv_format (a CSVFormat) through csv.writer, and
+    compressed when the path ends in .gz or .xz.  After each save ``stats``
+    is the OutputStats of what it wrote.
+    """
+
+    def __init__(self, csv_format=DEFAULT_FORMAT):
+        self.csv_format = csv_format
+        self.stats = None
+        self.path = None
+        self.saved_count = 0
+        self.file_state = None
+        self.layout = None
+        self.columns = None
+        self.keep_existing = False
+        self.adopted = None
+        self.seen = None
+
+    def invalidate(self):
+        """Forget the persisted state so the next save rewrites the file.
+
+        A resumed file is adopted again as it is now instead: clearing the
+        session must not let the next save replace the records it holds.
+        """
+        self.path = None
+        self.saved_count = 0
+        self.file_state = None
+        self.layout = None
+        self.columns = None
+        self.keep_existing = False
+        self.seen = None
+        if self.adopted:
+            self.adopt(*self.adopted)
+
+    def adopt(self, path, layout=LAYOUT_RECORDS, columns=None):
+        """Treat the file's current contents as saved, so the next saves append to it.
+
+        Used when resuming an existing output file.  A save that could only
+        rewrite the file (the grouped layout, new columns, or a save after
+        writing to another file) fails instead of replacing what was there.
+        """
+        self.adopted = (os.path.abspath(path), layout, columns)
+        self.path = os.path.abspath(path)
+        self.saved_count = 0
+        self.file_state = self._stat(self.path)
+        self.layout = layout
+        self.columns = columns
+        self.keep_existing = True
+        self.seen = None
+
+    def save(self, path, records, progress=None, layout=LAYOUT_RECORDS, dedupe=False):
+        """Persist records to path and return (mode, number of records written).
+
+        progress, if given, is called as progress(done, total) after each chunk.
+        """
+        path = os.path.abspath(path)
+        total = len(records)
+        columns = unified_columns(records) if layout == LAYOUT_UNIFIED else None
+        if columns is not None and self.columns and set(columns) <= set(self.columns):
+            # Keep writing under the existing header while it covers every column
+            columns = self.columns
+
+        if self._can_append(path, records, layout, columns):
+            start = self.saved_count
+            seen = self._seen_before(records, start) if dedupe else None
+            written = 0
+            self.stats = OutputStats(0, 0)
+            if start < total:
+                output = self.csv_format.open(path, 'a', compression_for(path))
+                with output as f:
+                    new_file = not self.keep_existing and start == 0
+                    written = self._write_records(f, records, layout, start, columns, new_file, seen, progress)
+                self.stats = output.stats
+            mode = 'append'
+        elif self.adopted and path == self.adopted[0]:
+            raise ValueError(
+                f"Cannot add these records to resumed file {path} without rewriting it; "
+                "use the header-per-record layout, resume the file again or choose a new output file"
+            )
+        else:
+            seen = set() if dedupe else None
+            written = self._rewrite(path, records, layout, columns, seen, progress)
+            mode = 'rewrite'
+
+        self.path = path
+        self.saved_count = total
+        self.file_state = self._stat(path)
+        self.layout = layout
+        self.columns = columns
+        self.keep_existing = bool(self.adopted) and path == self.adopted[0]
+        self.seen = seen
+        return mode, written
+
+    def _seen_before(self, records, start):
+        """Digests of the records already written, computed once if dedupe was just turned on."""
+        if self.seen is None:
+            self.seen = {record_digest(record.field_names, record.values) for record in iter_records(records, 0, start)}
+            if self.keep_existing:
+                # A resumed file also holds records from before this session
+                self.seen.update(iter_file_digests(self.path, self.layout, self.csv_format))
+        return self.seen
+
+    def _can_append(self, path, records, layout, columns):
+        """Check whether the file on disk is exactly what the last save left behind."""
+        if layout == LAYOUT_GROUPED and self.saved_count != len(records):
+            return False
+        return (
+            path == self.path
+            and (layout == self.layout or (self.keep_existing and layout == LAYOUT_RECORDS))
+            and (layout != LAYOUT_UNIFIED or columns == self.columns)
+            and self.saved_count <= len(records)
+            and self.file_state is not None
+            and self._stat(path) == self.file_state
+        )
+
+    def _write_records(self, f, records, layout, start, columns, new_file, seen, progress):
+        """Write records from start on to the text file f; return the number written."""
+        blocks = iter_layout_blocks(records, layout, start, columns, new_file=new_file, seen=seen)
+        return write_row_blocks(f, blocks, self.csv_format, len(records) - start, progress)
+
+    def _rewrite(self, path, records, layout, columns, seen, progress=None):
+        """Replace the file with all records via a temp file and rename; return the records written.
+
+        The temp file is synced before the rename, so the file is always either
+        the old or the complete new version.
+        """
+        import tempfile  # pulls in shutil and the compression modules; only needed here
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.csv_populator_', suffix='.tmp')
+        try:
+            output = self.csv_format.open(fd, compression=compression_for(path), sync=True)
+            with output as f:
+                written = self._write_records(f, records, layout, 0, columns, True, seen, progress)
+            self.stats = output.stats
+            os.chmod(temp_path, self._file_mode(path))
+            os.replace(temp_path, path)
+            return written
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _file_mode(self, path):
+        """Permission bits for the rewritten file: keep the old ones, else honour the umask."""
+        try:
+            return os.stat(path).st_mode & 0o777
+        except OSError:
+            return 0o666 & ~UMASK
+
+    def _stat(self, path):
+        """Return the (size, mtime) fingerprint of path, or None if missing."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns)
@@ -1,21 +1,170 @@
+import sys
+import time
+
+# Start-up milestones are measured from here
+STARTUP_STARTED = time.perf_counter()
+
+if __name__ == "__main__" and sys.argv[1:2] == ["batch"]:
+    # Headless batch generation runs without importing tkinter
+    from batch import main as batch_main
+    sys.exit(batch_main(sys.argv[2:]))
+
 import tkinter as tk
 from tkinter import ttk
+import argparse
+import itertools
 import json
 import os
-import re
+import queue
 from datetime import datetime
 
+from csv_export import (
+    DEFAULT_FORMAT,
+    LAYOUT_GROUPED,
+    LAYOUT_RECORDS,
+    LAYOUT_UNIFIED,
+    DeltaCSVWriter,
+    add_format_arguments,
+    format_from_args
+)
+from field_grid import FIELD, VALUE, FieldGrid, FieldModel
+from id_index import IDIndexWorker
+from output_formats import OutputWriter, format_stats, is_plain_csv
+from ids import IDAllocator, IDFormat, increment_id
+from preview_pane import PreviewPane
+from record_store import RecordStore, build_record
+from redraw import RedrawScheduler
+from save_worker import SaveWorker
+from startup import StartupTimer
+from templates import TemplateCache
+from validation import ValidationWorker
+
+DEFAULT_SESSION_FILE = os.path.join(os.path.expanduser("~"), "csv_populator_session.sqlite3")
+
 class CSVPopulatorApp:
     """CSV data entry application with dynamic field creation, ID management, and template support."""
     
-    def __init__(self, root):
+    # Amount added to the ID number for each new record
+    ID_STEP = 1
+    
+    # IDs reserved from the shared lease file at a time in shared-output mode
+    ID_LEASE_BLOCK = 100
+    
+    # Number of preview lines kept rendered; older records page in when scrolling up
+    PREVIEW_MAX_LINES = 1000
+    
+    # Autosave triggers (when enabled): elapsed seconds or unsaved records, 0 disables a trigger
+    AUTOSAVE_INTERVAL_SECONDS = 60
+    AUTOSAVE_EVERY_RECORDS = 25
+    
+    # Export layouts offered in the UI, mapped to csv_export layout names
+    EXPORT_LAYOUTS = {
+        "Header per record": LAYOUT_RECORDS,
+        "One header per field set": LAYOUT_GROUPED,
+        "Single table (all columns)": LAYOUT_UNIFIED
+    }
+    
+    # Parsed templates kept for the quick switcher (Ctrl+Shift+T)
+    TEMPLATE_CACHE_SIZE = 8
+    
+    # How often the duplicate-ID index worker is pointed at the output file and
+    # the indexes it has built are picked up
+    ID_INDEX_POLL_MS = 200
+    
+    # Field validation: quiet time after the last edit before values are checked,
+    # and how often results are picked up from the validation worker
+    VALIDATION_DEBOUNCE_MS = 250
+    VALIDATION_POLL_MS = 50
+    
+    # Longest wait for the first paint before deferred start-up work runs anyway
+    STARTUP_DEFER_MAX_MS = 500
+    
+    # How often the main loop picks up results from the background save worker
+    SAVE_POLL_MS = 100
+    
+    # Handlers timed when diagnostics are enabled, and how often memory is sampled
+    INSTRUMENTED_HANDLERS = (
+        '_handle_tab',
+        '_new_id',
+        '_paste_records',
+        '_save_to_csv',
+        '_load_template',
+        '_redraw_preview',
+        '_create_field_pair'
+    )
+    MEMORY_SAMPLE_MS = 30000
+    
+    # Group commit settings for the optional SQLite session store
+    SESSION_BATCH_RECORDS = 50
+    SESSION_COMMIT_MS = 500
+    
+    def __init__(self, root, diagnostics=None, session_path=None, shared=False, startup=None, csv_format=None, recorder=None):
         self.root = root
-        self.field_pairs = []
-        self.all_records = []
+        self.csv_format = csv_format or DEFAULT_FORMAT
+        self.shared = shared
+        self.startup = startup
+        self.started_up = False
+        self.diagnostics = diagnostics
+        if diagnostics:
+            # Wrap before the UI binds the handlers
+            diagnostics.instrument(self, self.INSTRUMENTED_HANDLERS)
+            if not diagnostics.dump_path:
+                diagnostics.dump_path = os.path.join(self._get_desktop_path(), "csv_populator_diagnostics.json")
+        # Input recording for replay (see recorder.py) also wraps handlers before they are bound
+        self.recorder = recorder
+        if recorder:
+            recorder.instrument(self)
+        self.fields = FieldModel()
+        
+        # Optional backends are imported on demand to keep start-up light
+        if session_path:
+            from session_store import SQLiteRecordStore
+            self.session_store = SQLiteRecordStore(session_path, batch_size=self.SESSION_BATCH_RECORDS)
+            self.all_records = self.session_store
+        else:
+            self.session_store = None
+            self.all_records = RecordStore()
+        # Shared output appends under a file lock and leases IDs per instance
+        if shared:
+            from shared_output import SharedCSVWriter
+            self.csv_writer = SharedCSVWriter(self.csv_format)
+        else:
+            self.csv_writer = DeltaCSVWriter(self.csv_format)
+        # The output file's extension picks CSV (.gz/.xz compressed), JSON Lines or SQLite
+        self.save_worker = SaveWorker(OutputWriter(self.csv_writer, csv_only=shared))
+        # Records known to be on disk (advanced by the worker's 'saved' events),
+        # and resets queued on the worker whose 'reset' event has not arrived yet
+        self.autosave_mark = 0
+        self.pending_resets = 0
+        self.id_allocator = None
+        self.id_lease = None
+        self.leased_id = None
+        self.session_ids = set()
+        self.output_ids = None
+        self.id_index_worker = None
+        self.duplicate_confirmed = None
+        self.template_cache = TemplateCache(self.TEMPLATE_CACHE_SIZE)
+        
+        # Compiled rules of the loaded template, and cached results per row:
+        # failing rows with their message, and rows whose result is outdated
+        self.field_rules = {}
+        self.validation_worker = None
+        self.validation_errors = {}
+        self.validation_stale = set()
+        self.validation_generation = 0
+        self.validation_timer = None
+        
+        # Redraws of the ID label, field rows and preview are coalesced per idle cycle
+        self.redraw = RedrawScheduler(root)
+        self.preview_reset = False
         
         self._setup_ui()
+        self.redraw.register('id_label', self._update_current_id_display)
+        self.redraw.register('preview', self._redraw_preview)
         self._initialize_data()
         self._bind_events()
+        if startup:
+            startup.mark('window_built')
     
     def _setup_ui(self):
         """Initialize all UI components."""
@@ -60,7 +209,7 @@ class CSVPopulatorApp:
         
         self.starting_id_name_entry = ttk.Entry(self.id_config_frame, width=15)
         self.starting_id_name_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 20))
-        self.starting_id_name_entry.bind('<KeyRelease>', self._update_current_id_display)
+        self.starting_id_name_entry.bind('<KeyRelease>', lambda e: self.redraw.mark('id_label'))
         
         # ID Number configuration
         self.starting_id_number_label = ttk.Label(
@@ -72,7 +221,7 @@ class CSVPopulatorApp:
         
         self.starting_id_number_entry = ttk.Entry(self.id_config_frame, width=15)
         self.starting_id_number_entry.grid(row=0, column=3, sticky=(tk.W, tk.E), padx=(0, 20))
-        self.starting_id_number_entry.bind('<KeyRelease>', self._update_current_id_display)
+        self.starting_id_number_entry.bind('<KeyRelease>', lambda e: self.redraw.mark('id_label'))
         
         # Current ID display
         self.current_id_label = ttk.Label(
@@ -81,7 +230,16 @@ class CSVPopulatorApp:
             font=("Arial", 10, "bold"), 
             foreground="gray"
         )
-        self.current_id_label.grid(row=1, column=0, columnspan=4, pady=(0, 10), sticky=tk.W)
+        self.current_id_label.grid(row=1, column=0, columnspan=3, pady=(0, 10), sticky=tk.W)
+        
+        # Drop repeated records when saving
+        self.dedupe_var = tk.BooleanVar(value=False)
+        self.dedupe_check = ttk.Checkbutton(
+            self.id_config_frame, 
+            text="Dedupe on save", 
+            variable=self.dedupe_var
+        )
+        self.dedupe_check.grid(row=1, column=3, sticky=tk.E, pady=(0, 10))
         
         # Output file configuration
         self.filename_label = ttk.Label(
@@ -102,7 +260,44 @@ class CSVPopulatorApp:
             font=("Arial", 8), 
             foreground="gray"
         )
-        self.filename_help.grid(row=3, column=0, columnspan=4, sticky=tk.W, pady=(0, 10))
+        self.filename_help.grid(row=3, column=0, columnspan=3, sticky=tk.W, pady=(0, 10))
+        
+        # Autosave toggle
+        self.autosave_var = tk.BooleanVar(value=False)
+        self.autosave_check = ttk.Checkbutton(
+            self.id_config_frame, 
+            text="Autosave", 
+            variable=self.autosave_var
+        )
+        self.autosave_check.grid(row=3, column=3, sticky=tk.E, pady=(0, 10))
+        
+        # Export layout
+        self.layout_label = ttk.Label(
+            self.id_config_frame, 
+            text="Export Layout:", 
+            font=("Arial", 10, "bold")
+        )
+        self.layout_label.grid(row=4, column=0, padx=(0, 10), sticky=tk.W)
+        
+        self.layout_combo = ttk.Combobox(
+            self.id_config_frame, 
+            values=list(self.EXPORT_LAYOUTS), 
+            state="readonly", 
+            width=32
+        )
+        self.layout_combo.current(0)
+        self.layout_combo.grid(row=4, column=1, columnspan=2, sticky=tk.W, pady=(0, 10))
+        if self.shared:
+            # Records from several instances interleave, so each keeps its own header
+            self.layout_combo.config(state="disabled")
+        
+        # Continue numbering from an existing output file
+        self.resume_button = ttk.Button(
+            self.id_config_frame, 
+            text="Resume from File", 
+            command=self._resume_from_file
+        )
+        self.resume_button.grid(row=4, column=3, sticky=tk.E, pady=(0, 10))
         
         # Set default filename
         default_filename = os.path.join(self._get_desktop_path(), "output.csv")
@@ -119,32 +314,24 @@ class CSVPopulatorApp:
         self._create_field_headers()
     
     def _setup_scrollable_canvas(self):
-        """Setup canvas and scrollbar for dynamic field content."""
-        self.canvas = tk.Canvas(self.fields_frame)
-        self.scrollbar = ttk.Scrollbar(self.fields_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-        
-        for i in range(4):
-            self.scrollable_frame.columnconfigure(i, weight=1)
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        """Setup the virtualized field grid and its scrollbar."""
+        self.field_grid = FieldGrid(
+            self.fields_frame,
+            self.fields,
+            on_tab=self._handle_tab,
+            on_enter=self._handle_enter,
+            on_delete=self._delete_field_pair,
+            on_edit=self._on_field_edit,
+            scheduler=self.redraw
         )
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas = self.field_grid.canvas
+        self.scrollbar = self.field_grid.scrollbar
         
         self.canvas.grid(row=1, column=0, columnspan=4, sticky=(tk.W, tk.E, tk.N, tk.S))
         self.scrollbar.grid(row=1, column=4, sticky=(tk.N, tk.S))
         
         self.fields_frame.columnconfigure(0, weight=1)
         self.fields_frame.rowconfigure(1, weight=1)
-        
-        # Bind mouse wheel events
-        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
-        self.canvas.bind("<Button-4>", self._on_mousewheel)
-        self.canvas.bind("<Button-5>", self._on_mousewheel)
     
     def _create_field_headers(self):
         """Create field name and value headers."""
@@ -176,6 +363,17 @@ class CSVPopulatorApp:
         )
         self.preview_label.grid(row=0, column=0, sticky=tk.W)
         
+        # Switch between the session preview and a paged view of the output file on disk
+        self.output_viewer = None
+        self.viewer_var = tk.BooleanVar(value=False)
+        self.viewer_check = ttk.Checkbutton(
+            self.preview_frame, 
+            text="View output file", 
+            variable=self.viewer_var, 
+            command=self._toggle_output_viewer
+        )
+        self.viewer_check.grid(row=0, column=0, columnspan=2, sticky=tk.E)
+        
         self.preview_canvas = tk.Canvas(self.preview_frame, height=150)
         self.preview_scrollbar = ttk.Scrollbar(
             self.preview_frame, 
@@ -189,9 +387,15 @@ class CSVPopulatorApp:
             state=tk.DISABLED
         )
         
-        self.preview_text.configure(yscrollcommand=self.preview_scrollbar.set)
+        self.preview = PreviewPane(
+            self.preview_text,
+            self.preview_scrollbar,
+            record_count=lambda: len(self.all_records),
+            record_slice=lambda start, stop: self.all_records[start:stop],
+            max_lines=self.PREVIEW_MAX_LINES,
+            format_line=self.csv_format.format_line
+        )
         self.preview_canvas.create_window((0, 0), window=self.preview_text, anchor="nw")
-        self.preview_canvas.configure(yscrollcommand=self.preview_scrollbar.set)
         
         self.preview_text.bind(
             '<Configure>', 
@@ -204,6 +408,30 @@ class CSVPopulatorApp:
         self.preview_frame.columnconfigure(0, weight=1)
         self.preview_frame.rowconfigure(1, weight=1)
     
+    def _toggle_output_viewer(self):
+        """Show the output file viewer in place of the session preview, or switch back."""
+        if self.viewer_var.get():
+            if self.output_viewer is None:
+                from output_viewer import OutputViewer
+                self.output_viewer = OutputViewer(
+                    self.preview_frame,
+                    get_path=lambda: os.path.abspath(self._get_output_path())
+                )
+            self.preview_canvas.grid_remove()
+            self.preview_scrollbar.grid_remove()
+            self.output_viewer.frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+            self.preview_label.config(text="Output File:")
+            try:
+                self.output_viewer.show()
+            except OSError as e:
+                self.status_label.config(text=f"Error reading output file: {str(e)}")
+        else:
+            self.output_viewer.hide()
+            self.output_viewer.frame.grid_remove()
+            self.preview_canvas.grid()
+            self.preview_scrollbar.grid()
+            self.preview_label.config(text="Preview:")
+    
     def _create_buttons_section(self):
         """Create button section with all application controls."""
         self.buttons_frame = ttk.Frame(self.main_frame)
@@ -236,21 +464,78 @@ class CSVPopulatorApp:
     def _initialize_data(self):
         """Initialize application data and create first field pair."""
         self._create_field_pair()
-        self._update_current_id_display()
-        self._update_csv_preview()
+        self.redraw.mark('id_label')
+        self._schedule_preview(reset=True)
         self.starting_id_name_entry.focus_set()
+        
+        if self.shared:
+            self.status_label.config(text="Shared output: IDs are leased from the output file's .ids file")
     
     def _bind_events(self):
         """Bind keyboard shortcuts and events."""
         self.root.bind('<Tab>', self._handle_tab)
         self.root.bind('<Control-Shift-N>', self._new_id)
+        self.root.bind('<Control-Shift-T>', self._show_template_switcher)
+        self.root.bind('<Control-Shift-V>', self._paste_records)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         self.main_frame.rowconfigure(4, weight=1)
+        
+        self.root.after(self.SAVE_POLL_MS, self._poll_save_worker)
+        
+        # Work the first window does not need waits until it has been drawn
+        self.root.bind('<Expose>', self._on_first_expose, add='+')
+        self.root.after(self.STARTUP_DEFER_MAX_MS, self._finish_startup)
+        if self.AUTOSAVE_INTERVAL_SECONDS:
+            self.root.after(self.AUTOSAVE_INTERVAL_SECONDS * 1000, self._autosave_tick)
+        
+        if self.diagnostics:
+            self.root.bind('<Control-Shift-D>', self._show_diagnostics)
+            self._sample_memory()
+        
+        if self.session_store:
+            self.root.after(self.SESSION_COMMIT_MS, self._commit_session)
+    
+    def _on_first_expose(self, event=None):
+        """Note the first paint and finish start-up once the event queue is idle."""
+        self.root.unbind('<Expose>')
+        if self.startup:
+            self.startup.mark('first_paint')
+        self.root.after_idle(self._finish_startup)
+    
+    def _finish_startup(self):
+        """Run the start-up work deferred until after the first paint."""
+        if self.started_up:
+            return
+        self.started_up = True
+        
+        if self.session_store:
+            self._resume_session()
+        self.id_index_worker = IDIndexWorker()
+        self.root.after(self.ID_INDEX_POLL_MS, self._index_output_ids)
+        
+        if self.recorder:
+            try:
+                self.recorder.start(self)
+            except OSError as e:
+                self.status_label.config(text=f"Error starting input recording: {str(e)}")
+        
+        if self.startup:
+            self.startup.interactive()
     
     def _get_desktop_path(self):
         """Get the user's desktop path with fallback."""
         desktop = os.path.join(os.path.expanduser("~"), "Desktop")
         return desktop if os.path.exists(desktop) else os.getcwd()
     
+    def _get_output_path(self):
+        """Resolve the output file path, defaulting to the desktop."""
+        filename = self.filename_entry.get().strip()
+        if not filename:
+            filename = os.path.join(self._get_desktop_path(), "output.csv")
+        elif not os.path.dirname(filename):
+            filename = os.path.join(self._get_desktop_path(), filename)
+        return filename
+    
     def _get_current_id(self):
         """Get the current ID number from the entry field."""
         id_text = self.starting_id_number_entry.get().strip()
@@ -271,177 +556,133 @@ class CSVPopulatorApp:
             self.current_id_label.config(text="Current ID: (not configured)")
     
     def _increment_id(self, current_id):
-        """Increment alphanumeric ID by extracting numeric part and adding 1."""
-        if not current_id:
-            return None
+        """Return the ID after current_id, keeping its prefix, suffix and padding."""
+        if self.shared:
+            return self._lease_id(current_id)
         
-        match = re.match(r'^([A-Za-z]*)(\d+)$', current_id)
-        if match:
-            prefix = match.group(1)
-            number = int(match.group(2))
-            return f"{prefix}{number + 1}"
-        return current_id
+        allocator = self.id_allocator
+        if allocator is None or allocator.current != current_id:
+            # Parse again only when the ID was edited by hand
+            try:
+                allocator = self.id_allocator = IDAllocator(current_id, self.ID_STEP)
+            except ValueError:
+                self.id_allocator = None
+                return increment_id(current_id)
+        allocator.next()
+        return allocator.current
     
-    def _update_csv_preview(self):
-        """Update the CSV preview text display."""
-        self.preview_text.config(state=tk.NORMAL)
-        self.preview_text.delete(1.0, tk.END)
+    def _lease_id(self, seed_id):
+        """Take the next ID from this instance's block of the output file's ID lease."""
+        from shared_output import IDLease
+        
+        output_path = os.path.abspath(self._get_output_path())
+        if self.id_lease is None or self.id_lease.output_path != output_path:
+            self.id_lease = IDLease(output_path, self.ID_LEASE_BLOCK, self.ID_STEP)
+        self.leased_id = self.id_lease.next(seed_id)
+        return self.leased_id
+    
+    def _ensure_leased_id(self):
+        """In shared mode, replace a current ID not leased by this instance with a leased one."""
+        current_id = self._get_current_id()
+        if not self.shared or current_id is None or current_id == self.leased_id:
+            return True
         
-        if not self.all_records:
-            self.preview_text.insert(tk.END, "No records yet. Complete a row and press 'New ID' to see preview.")
+        try:
+            leased_id = self._lease_id(current_id)
+        except (OSError, ValueError) as e:
+            self.status_label.config(text=f"Could not lease an ID: {str(e)}")
+            return False
+        
+        self.starting_id_number_entry.delete(0, tk.END)
+        self.starting_id_number_entry.insert(0, leased_id)
+        self.redraw.mark('id_label')
+        return True
+    
+    def _update_csv_preview(self):
+        """Re-render the CSV preview from the newest records."""
+        self.preview.refresh()
+    
+    def _schedule_preview(self, reset=False):
+        """Mark the preview dirty; reset re-renders it instead of appending new records."""
+        self.preview_reset = self.preview_reset or reset
+        self.redraw.mark('preview')
+    
+    def _redraw_preview(self):
+        """Bring the preview up to date in one pass."""
+        if self.preview_reset:
+            self.preview_reset = False
+            self._update_csv_preview()
         else:
-            for record in self.all_records:
-                field_names = record['field_names']
-                values = record['values']
-                
-                self.preview_text.insert(tk.END, ','.join(field_names) + '\n')
-                self.preview_text.insert(tk.END, ','.join(values) + '\n')
-        
-        self.preview_text.config(state=tk.DISABLED)
-        self.preview_text.see(tk.END)
-    
-    def _create_field_pair(self):
-        """Create a new field name/value pair row."""
-        row = len(self.field_pairs) + 1
-        
-        pair_frame = ttk.Frame(self.scrollable_frame)
-        pair_frame.grid(row=row, column=0, columnspan=4, sticky=(tk.W, tk.E))
-        pair_frame.columnconfigure(0, weight=0)
-        pair_frame.columnconfigure(1, weight=1)
-        pair_frame.columnconfigure(2, weight=0)
-        pair_frame.columnconfigure(3, weight=1)
-        pair_frame.columnconfigure(4, weight=0)
-        
-        row_label = ttk.Label(pair_frame, text=f"Row {row}:")
-        row_label.grid(row=0, column=0, padx=(0, 10), sticky=tk.W)
-        
-        field_entry = ttk.Entry(pair_frame, width=30)
-        field_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 20))
-        
-        value_entry = ttk.Entry(pair_frame, width=30)
-        value_entry.grid(row=0, column=3, sticky=(tk.W, tk.E), padx=(0, 10))
-        
-        current_index = len(self.field_pairs)
-        delete_btn = ttk.Button(
-            pair_frame, 
-            text="×", 
-            width=3,
-            command=lambda idx=current_index: self._delete_field_pair(idx)
-        )
-        delete_btn.grid(row=0, column=4, padx=(10, 0))
-        
-        pair_data = {
-            'frame': pair_frame,
-            'field_entry': field_entry,
-            'value_entry': value_entry,
-            'row_label': row_label,
-            'delete_btn': delete_btn
-        }
-        
-        self.field_pairs.append(pair_data)
-        
-        # Bind events
-        field_entry.bind('<Tab>', self._handle_tab)
-        field_entry.bind('<Return>', self._handle_enter)
-        value_entry.bind('<Tab>', self._handle_tab)
-        value_entry.bind('<Return>', self._handle_enter)
-        
-        # Update scroll region and scroll to bottom
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        self.canvas.update_idletasks()
-        self.root.after(10, lambda: self.canvas.yview_moveto(1.0))
-        
-        return field_entry, value_entry
+            self.preview.sync()
+    
+    def _create_field_pair(self, field_name=''):
+        """Add a field name/value row, scroll it into view and return its index."""
+        index = self.fields.append(field_name)
+        self.field_grid.refresh()
+        self.field_grid.scroll_to_end()
+        return index
+    
+    def _create_field_pairs(self, field_names):
+        """Replace all rows with field_names using one model update and one layout pass."""
+        self.fields.reset(str(field_name) for field_name in field_names if field_name)
+        
+        # A single scroll region update and render covers every row
+        self.field_grid.refresh()
+        self.field_grid.scroll_to_top()
+        self._revalidate_all()
     
     def _handle_tab(self, event):
         """Handle TAB navigation with smart field skipping and new row creation."""
-        current_widget = event.widget
-        
-        current_pair_index = None
-        is_field_entry = False
-        
-        for i, pair in enumerate(self.field_pairs):
-            if pair['field_entry'] == current_widget:
-                current_pair_index = i
-                is_field_entry = True
-                break
-            elif pair['value_entry'] == current_widget:
-                current_pair_index = i
-                is_field_entry = False
-                break
-        
-        if current_pair_index is not None:
-            if is_field_entry:
-                if self.field_pairs[current_pair_index]['field_entry'].get().strip():
+        cell = self.field_grid.cell_of(event.widget)
+        if cell is None:
+            return None
+        
+        current_pair_index, role = cell
+        is_field_entry = role == FIELD
+        is_last_pair = current_pair_index == len(self.fields) - 1
+        
+        if is_field_entry:
+            if not self.fields.is_empty(current_pair_index, FIELD):
+                next_field = self._find_next_empty_field(current_pair_index, is_field_entry)
+                if next_field:
+                    self.field_grid.focus_cell(*next_field)
+                    return "break"
+            else:
+                self.field_grid.focus_cell(current_pair_index, VALUE)
+                return "break"
+        else:
+            if not self.fields.is_empty(current_pair_index, VALUE):
+                if is_last_pair:
+                    new_index = self._create_field_pair()
+                    self.field_grid.focus_cell(new_index, FIELD)
+                    self._update_row_labels()
+                    return "break"
+                else:
                     next_field = self._find_next_empty_field(current_pair_index, is_field_entry)
                     if next_field:
-                        next_field.focus_set()
+                        self.field_grid.focus_cell(*next_field)
                         return "break"
-                else:
-                    self.field_pairs[current_pair_index]['value_entry'].focus_set()
-                    return "break"
             else:
-                if self.field_pairs[current_pair_index]['value_entry'].get().strip():
-                    if current_pair_index == len(self.field_pairs) - 1:
-                        new_field, new_value = self._create_field_pair()
-                        new_field.focus_set()
-                        self._update_row_labels()
-                        return "break"
-                    else:
-                        next_field = self._find_next_empty_field(current_pair_index, is_field_entry)
-                        if next_field:
-                            next_field.focus_set()
-                            return "break"
+                if is_last_pair:
+                    new_index = self._create_field_pair()
+                    self.field_grid.focus_cell(new_index, FIELD)
+                    self._update_row_labels()
+                    return "break"
                 else:
-                    if current_pair_index == len(self.field_pairs) - 1:
-                        new_field, new_value = self._create_field_pair()
-                        new_field.focus_set()
-                        self._update_row_labels()
-                        return "break"
-                    else:
-                        next_pair_index = current_pair_index + 1
-                        self.field_pairs[next_pair_index]['field_entry'].focus_set()
-                        return "break"
+                    self.field_grid.focus_cell(current_pair_index + 1, FIELD)
+                    return "break"
         
         return None
     
     def _find_topmost_empty_field(self):
-        """Find the first empty field from the top."""
-        for pair in self.field_pairs:
-            if not pair['field_entry'].get().strip():
-                return pair['field_entry']
-            elif not pair['value_entry'].get().strip():
-                return pair['value_entry']
-        return None
+        """Find the first empty field from the top as (index, role)."""
+        return self.fields.first_empty()
     
     def _find_next_empty_field(self, current_pair_index, is_field_entry):
-        """Find next empty field while preventing infinite loops."""
-        visited = set()
-        current_index = current_pair_index
-        current_is_field = is_field_entry
-        
-        while True:
-            if current_is_field:
-                current_field = self.field_pairs[current_index]['field_entry']
-                current_value = self.field_pairs[current_index]['value_entry']
-                
-                if not current_field.get().strip():
-                    return current_field
-                elif not current_value.get().strip():
-                    return current_value
-                else:
-                    current_is_field = False
-            else:
-                if current_index == len(self.field_pairs) - 1:
-                    return None
-                else:
-                    current_index += 1
-                    current_is_field = True
-            
-            visited_key = (current_index, current_is_field)
-            if visited_key in visited:
-                return None
-            visited.add(visited_key)
+        """Find next empty field as (index, role), starting at the current pair's field or the next pair."""
+        if is_field_entry:
+            return self.fields.first_empty(current_pair_index, FIELD)
+        return self.fields.first_empty(current_pair_index + 1, FIELD)
     
     def _handle_enter(self, event):
         """Handle Enter key same as Tab."""
@@ -449,57 +690,54 @@ class CSVPopulatorApp:
     
     def _delete_field_pair(self, index):
         """Delete a field pair at the specified index."""
-        if len(self.field_pairs) <= 1:
+        if len(self.fields) <= 1:
             return
         
-        self.field_pairs[index]['frame'].destroy()
-        del self.field_pairs[index]
+        self.fields.delete(index)
         
+        self._revalidate_all()
         self._update_row_labels()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
         self.status_label.config(text=f"Deleted row {index + 1}")
     
     def _update_row_labels(self):
-        """Update row labels after deletion."""
-        for i, pair in enumerate(self.field_pairs):
-            pair['row_label'].config(text=f"Row {i + 1}:")
-    
-    def _on_mousewheel(self, event):
-        """Handle mouse wheel scrolling."""
-        if event.num == 4:
-            self.canvas.yview_scroll(-1, "units")
-        elif event.num == 5:
-            self.canvas.yview_scroll(1, "units")
-        else:
-            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+        """Re-render visible rows so labels and scroll region match the field list."""
+        self.field_grid.refresh()
     
     def _save_current_record(self):
         """Save the current form data as a record."""
-        field_names = []
-        values = []
-        
         id_name = self.starting_id_name_entry.get().strip()
         current_id = self._get_current_id()
         
-        if id_name and current_id is not None:
-            field_names.append(id_name)
-            values.append(str(current_id))
-        
-        for pair in self.field_pairs:
-            field_name = pair['field_entry'].get().strip()
-            value = pair['value_entry'].get().strip()
-            
-            if field_name and value:
-                field_names.append(field_name)
-                values.append(value)
+        record = build_record(id_name, current_id, self.fields.pairs())
         
-        if len(field_names) > 1:
-            record = {
-                'field_names': field_names,
-                'values': values
-            }
-            self.all_records.append(record)
-            self._update_csv_preview()
+        if record:
+            self.all_records.append(*record)
+            self._schedule_preview()
+            if id_name and current_id is not None:
+                self.session_ids.add(current_id)
+    
+    def _check_current_record(self, current_id, button):
+        """Check the form against the field rules and duplicate IDs before it becomes a record.
+        
+        Returns False, with the reason in the status bar, to stop; a duplicate ID
+        goes through when button is pressed again for the same ID.
+        """
+        errors = self._record_errors()
+        if errors:
+            index = min(errors)
+            self.status_label.config(
+                text=f"Row {index + 1} ({self.fields.names[index].strip()}) {errors[index]} - {len(errors)} invalid field(s)"
+            )
+            self.field_grid.focus_cell(index, VALUE)
+            return False
+        
+        duplicate = self._find_duplicate_id(current_id)
+        if duplicate and self.duplicate_confirmed != current_id:
+            self.duplicate_confirmed = current_id
+            self.status_label.config(text=f"Duplicate ID {current_id}: {duplicate} - press {button} again to save it anyway")
+            return False
+        self.duplicate_confirmed = None
+        return True
     
     def _new_id(self, event=None):
         """Create a new ID and save the current record."""
@@ -510,9 +748,20 @@ class CSVPopulatorApp:
             self.status_label.config(text="Please configure both ID name and number first")
             return
         
+        if not self._ensure_leased_id():
+            return
+        current_id = self._get_current_id()
+        
+        if not self._check_current_record(current_id, "New ID"):
+            return
+        
         self._save_current_record()
         
-        new_id = self._increment_id(current_id)
+        try:
+            new_id = self._increment_id(current_id)
+        except (OSError, ValueError) as e:
+            self.status_label.config(text=f"Could not lease an ID: {str(e)}")
+            return
         
         if new_id:
             self.starting_id_number_entry.delete(0, tk.END)
@@ -522,57 +771,427 @@ class CSVPopulatorApp:
             return
         
         # Clear value fields
-        for pair in self.field_pairs:
-            pair['value_entry'].delete(0, tk.END)
+        self.fields.clear_values()
+        self.field_grid.refresh()
+        self._revalidate_all()
         
         # Focus on first empty field
-        if self.field_pairs:
+        if len(self.fields):
             topmost_empty = self._find_topmost_empty_field()
             if topmost_empty:
-                topmost_empty.focus_set()
+                self.field_grid.focus_cell(*topmost_empty)
             else:
-                self.field_pairs[0]['field_entry'].focus_set()
+                self.field_grid.focus_cell(0, FIELD)
         
-        self._update_current_id_display()
+        self.redraw.mark('id_label')
+        self._remember_session_state()
+        self._maybe_autosave()
         self.status_label.config(text=f"New ID created: {new_id} - {len(self.all_records)} records saved")
     
+    def _paste_records(self, event=None):
+        """Turn tab-separated clipboard rows (e.g. copied from Excel) into records in one batch.
+        
+        Rows are numbered from the current ID, and the form moves on to the ID after the last one.
+        """
+        from paste import iter_clipboard_rows, iter_pasted_fields, map_columns
+        
+        id_name = self.starting_id_name_entry.get().strip()
+        current_id = self._get_current_id()
+        if not id_name or current_id is None:
+            self.status_label.config(text="Please configure both ID name and number first")
+            return "break"
+        if IDFormat.parse(current_id) is None:
+            self.status_label.config(text="Could not increment ID format")
+            return "break"
+        
+        field_names = [field_name for field_name, value in self.fields.pairs() if field_name]
+        if not field_names:
+            self.status_label.config(text="Enter field names or load a template before pasting rows")
+            return "break"
+        
+        try:
+            text = self.root.clipboard_get()
+        except tk.TclError:
+            self.status_label.config(text="Clipboard is empty")
+            return "break"
+        
+        if not self._ensure_leased_id():
+            return "break"
+        
+        start_time = time.perf_counter()
+        rows = iter_clipboard_rows(text)
+        first_row = next(rows, None)
+        if first_row is None:
+            self.status_label.config(text="No rows on the clipboard")
+            return "break"
+        
+        columns, has_header = map_columns(first_row, field_names, id_name)
+        if not has_header:
+            rows = itertools.chain([first_row], rows)
+        first_line = 2 if has_header else 1
+        rules = [(name, self.field_rules[name]) for name in field_names if name in self.field_rules]
+        
+        # Build every record first so a bad row leaves the session untouched
+        records = []
+        next_id = self._get_current_id()
+        try:
+            for line_number, fields in enumerate(iter_pasted_fields(rows, columns, first_line), first_line):
+                if rules:
+                    values = dict(fields)
+                    for name, rule in rules:
+                        message = rule.check(values.get(name, ''))
+                        if message:
+                            raise ValueError(f"Row {line_number} ({name}) {message}")
+                
+                record = build_record(id_name, next_id, fields)
+                if record:
+                    records.append(record)
+                    next_id = self._increment_id(next_id)
+        except (OSError, ValueError) as e:
+            self.status_label.config(text=f"Paste cancelled: {str(e)}")
+            return "break"
+        
+        if not records:
+            self.status_label.config(text="No values to paste")
+            return "break"
+        
+        self.all_records.extend(records)
+        self.session_ids.update(values[0] for field_names, values in records)
+        
+        self.starting_id_number_entry.delete(0, tk.END)
+        self.starting_id_number_entry.insert(0, next_id)
+        self.redraw.mark('id_label')
+        self._schedule_preview()
+        self._remember_session_state()
+        self._maybe_autosave()
+        
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.status_label.config(
+            text=f"Pasted {len(records)} records ({records[0][1][0]} to {records[-1][1][0]}) in {elapsed_ms:.0f} ms - next ID {next_id}"
+        )
+        return "break"
+    
     def _save_to_csv(self):
-        """Save all records to a CSV file."""
+        """Save all records to a CSV file on the background save worker."""
+        if not self._ensure_leased_id():
+            return
+        
+        # The form is only checked when it holds a record to add
+        id_name = self.starting_id_name_entry.get().strip()
+        current_id = self._get_current_id()
+        if build_record(id_name, current_id, self.fields.pairs()) and not self._check_current_record(current_id, "Save to CSV"):
+            return
         self._save_current_record()
         
         if not self.all_records:
             self.status_label.config(text="No records to save")
             return
         
+        self._submit_save()
+    
+    def _submit_save(self, autosave=False):
+        """Hand a snapshot of the records to the save worker."""
         try:
-            csv_content = ""
+            filename = os.path.abspath(self._get_output_path())
+            layout = self.EXPORT_LAYOUTS[self.layout_combo.get()]
+            coalesced = self.save_worker.submit(filename, self.all_records.snapshot(), layout, self.dedupe_var.get())
             
-            for record in self.all_records:
-                field_names = record['field_names']
-                values = record['values']
-                
-                csv_content += ','.join(field_name for field_name in field_names) + '\n'
-                csv_content += ','.join(value for value in values) + '\n'
-            
-            filename = self.filename_entry.get().strip()
-            if not filename:
-                filename = os.path.join(self._get_desktop_path(), "output.csv")
-            elif not os.path.dirname(filename):
-                filename = os.path.join(self._get_desktop_path(), filename)
-            
-            # Ensure the directory exists
-            os.makedirs(os.path.dirname(filename), exist_ok=True)
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(csv_content)
-            
-            # Show full path in status
-            abs_path = os.path.abspath(filename)
-            self.status_label.config(text=f"Saved {len(self.all_records)} records to: {abs_path}")
+            prefix = "Autosaving" if autosave else "Saving"
+            if coalesced:
+                self.status_label.config(text=f"{prefix} {len(self.all_records)} records (queued behind current save)...")
+            else:
+                self.status_label.config(text=f"{prefix} {len(self.all_records)} records...")
             
         except Exception as e:
             self.status_label.config(text=f"Error saving: {str(e)}")
     
+    def _poll_save_worker(self):
+        """Show progress and results posted by the save worker."""
+        try:
+            while True:
+                event = self.save_worker.events.get_nowait()
+                kind = event[0]
+                
+                if kind == 'progress':
+                    done, total = event[1], event[2]
+                    self.status_label.config(text=f"Saving... {done}/{total} records ({done * 100 // max(total, 1)}%)")
+                elif kind == 'reset':
+                    self.pending_resets -= 1
+                elif kind == 'saved':
+                    path, mode, written, total, stats = event[1:]
+                    if not self.pending_resets:
+                        # Only a save of this session's records counts towards it
+                        self.autosave_mark = max(self.autosave_mark, total)
+                    size = f" - {format_stats(stats)}" if stats else ""
+                    # Show full path in status
+                    if mode == 'append':
+                        self.status_label.config(text=f"Appended {written} new records ({total} total) to: {path}{size}")
+                    else:
+                        dropped = f" ({total - written} duplicates dropped)" if written < total else ""
+                        self.status_label.config(text=f"Saved {written} records to: {path}{dropped}{size}")
+                elif kind == 'error':
+                    self.status_label.config(text=f"Error saving: {str(event[2])}")
+        except queue.Empty:
+            pass
+        
+        self.root.after(self.SAVE_POLL_MS, self._poll_save_worker)
+    
+    def _on_field_edit(self, index, role):
+        """Check an edited row once typing pauses, if the template has rules."""
+        if not self.field_rules:
+            return
+        self.validation_stale.add(index)
+        self._schedule_validation()
+    
+    def _schedule_validation(self):
+        """Restart the debounce timer for submitting outdated rows to the validation worker."""
+        if self.validation_timer is not None:
+            self.root.after_cancel(self.validation_timer)
+        self.validation_timer = self.root.after(self.VALIDATION_DEBOUNCE_MS, self._submit_validation)
+    
+    def _revalidate_all(self):
+        """Drop cached results after rows or rules change and check every row again."""
+        self.validation_generation += 1
+        self.validation_errors.clear()
+        self.field_grid.clear_markers()
+        if self.field_rules:
+            self.validation_stale = set(range(len(self.fields)))
+            self._schedule_validation()
+        else:
+            self.validation_stale = set()
+    
+    def _rule_for(self, index):
+        """Return the compiled rule of row index's field, or None."""
+        return self.field_rules.get(self.fields.names[index].strip())
+    
+    def _submit_validation(self):
+        """Send outdated rows to the validation worker."""
+        self.validation_timer = None
+        if self.validation_worker is None:
+            self.validation_worker = ValidationWorker()
+            self.root.after(self.VALIDATION_POLL_MS, self._poll_validation)
+        
+        for index in list(self.validation_stale):
+            if index >= len(self.fields):
+                self.validation_stale.discard(index)
+                continue
+            rule = self._rule_for(index)
+            if rule is None:
+                self._store_validation(index, None)
+            else:
+                key = (self.validation_generation, index)
+                self.validation_worker.submit(key, rule, self.fields.values[index].strip())
+    
+    def _poll_validation(self):
+        """Apply results from the validation worker that still match the rows."""
+        try:
+            focused = self.field_grid.focused_cell()
+            while True:
+                (generation, index), rule, value, message = self.validation_worker.events.get_nowait()
+                
+                # Results for rows edited or renumbered since submission are dropped
+                if generation != self.validation_generation or index >= len(self.fields):
+                    continue
+                if rule is not self._rule_for(index) or value != self.fields.values[index].strip():
+                    continue
+                self._store_validation(index, message)
+                
+                if message and value and focused and focused[0] == index:
+                    self.status_label.config(text=f"Row {index + 1} ({rule.name}) {message}")
+        except queue.Empty:
+            pass
+        finally:
+            self.root.after(self.VALIDATION_POLL_MS, self._poll_validation)
+    
+    def _store_validation(self, index, message):
+        """Cache the result for row index and update its marker."""
+        self.validation_stale.discard(index)
+        if message:
+            self.validation_errors[index] = message
+        else:
+            self.validation_errors.pop(index, None)
+        
+        # Empty required fields are reported at New ID time rather than marked while typing
+        self.field_grid.set_marker(index, message if self.fields.values[index].strip() else None)
+    
+    def _record_errors(self):
+        """Return {row index: message} for the current record from the cached results.
+        
+        Only rows still waiting for the worker are checked here.
+        """
+        for index in list(self.validation_stale):
+            if index >= len(self.fields):
+                self.validation_stale.discard(index)
+                continue
+            rule = self._rule_for(index)
+            self._store_validation(index, rule.check(self.fields.values[index].strip()) if rule else None)
+        return self.validation_errors
+    
+    def _maybe_autosave(self):
+        """Autosave once enough records have been added since the last save."""
+        unsaved = len(self.all_records) - self.autosave_mark
+        if self.autosave_var.get() and self.AUTOSAVE_EVERY_RECORDS and unsaved >= self.AUTOSAVE_EVERY_RECORDS and not self.save_worker.busy:
+            self._submit_save(autosave=True)
+    
+    def _autosave_tick(self):
+        """Periodic autosave of any unsaved records."""
+        if self.autosave_var.get() and len(self.all_records) > self.autosave_mark and not self.save_worker.busy:
+            self._submit_save(autosave=True)
+        self.root.after(self.AUTOSAVE_INTERVAL_SECONDS * 1000, self._autosave_tick)
+    
+    def _reset_saved_state(self):
+        """Forget what has been saved after the records are cleared."""
+        self.save_worker.invalidate()
+        self.pending_resets += 1
+        self.autosave_mark = 0
+        self.session_ids.clear()
+    
+    def _find_duplicate_id(self, current_id):
+        """Describe where current_id is already used, or return None; constant time."""
+        if current_id in self.session_ids:
+            return "already used in this session"
+        if self.output_ids and self.output_ids.path == os.path.abspath(self._get_output_path()) and current_id in self.output_ids:
+            return f"probably already in {os.path.basename(self.output_ids.path)}"
+        return None
+    
+    def _index_output_ids(self):
+        """Point the ID index worker at the output file and pick up the indexes it has built."""
+        try:
+            output_path = os.path.abspath(self._get_output_path())
+            id_name = self.starting_id_name_entry.get().strip()
+            if is_plain_csv(output_path):
+                self.id_index_worker.watch(output_path, id_name, self.csv_format.delimiter)
+            else:
+                # Only plain CSV output can be scanned for IDs
+                self.id_index_worker.watch(None)
+            
+            index = self.output_ids
+            while True:
+                try:
+                    event = self.id_index_worker.events.get_nowait()
+                except queue.Empty:
+                    break
+                # A broken index only disables the duplicate warning for the output file
+                index = event[1] if event[0] == 'ready' else None
+            if index is not None and (index.path != output_path or index.id_name != id_name.encode('utf-8')):
+                index = None
+            self.output_ids = index
+        except Exception:
+            self.output_ids = None
+        finally:
+            self.root.after(self.ID_INDEX_POLL_MS, self._index_output_ids)
+    
+    def _on_close(self):
+        """Let queued saves finish before the window closes."""
+        if self.save_worker.busy:
+            self.status_label.config(text="Finishing save before exit...")
+            self.root.update_idletasks()
+        self.save_worker.close()
+        if self.output_viewer:
+            self.output_viewer.hide()
+        if self.validation_worker:
+            self.validation_worker.close(timeout=1)
+        if self.id_index_worker:
+            self.id_index_worker.close(timeout=1)
+        
+        if self.session_store:
+            self._remember_session_state()
+            self.session_store.close()
+        
+        if self.diagnostics:
+            try:
+                self.diagnostics.sample_memory(len(self.all_records))
+                self.diagnostics.dump()
+            except OSError:
+                pass
+        
+        if self.recorder:
+            self.recorder.close()
+        
+        self.root.destroy()
+    
+    def _commit_session(self):
+        """Group-commit buffered session records every SESSION_COMMIT_MS."""
+        try:
+            self.session_store.flush()
+        except Exception as e:
+            self.status_label.config(text=f"Error writing session: {str(e)}")
+        self.root.after(self.SESSION_COMMIT_MS, self._commit_session)
+    
+    def _remember_session_state(self):
+        """Store the ID settings, output path and field names with the session."""
+        if not self.session_store:
+            return
+        self.session_store.set_meta('id_name', self.starting_id_name_entry.get().strip())
+        self.session_store.set_meta('next_id', self.starting_id_number_entry.get().strip())
+        self.session_store.set_meta('output_path', self.filename_entry.get().strip())
+        self.session_store.set_meta('field_names', json.dumps(self.fields.names))
+    
+    def _resume_session(self):
+        """Restore the previous session's settings and records from the session store."""
+        store = self.session_store
+        
+        field_names = json.loads(store.get_meta('field_names', '[]'))
+        if field_names:
+            self._create_field_pairs(field_names)
+            if not len(self.fields):
+                self._create_field_pair()
+        
+        for entry, key in (
+            (self.starting_id_name_entry, 'id_name'),
+            (self.starting_id_number_entry, 'next_id'),
+            (self.filename_entry, 'output_path')
+        ):
+            value = store.get_meta(key)
+            if value:
+                entry.delete(0, tk.END)
+                entry.insert(0, value)
+        
+        self.redraw.mark('id_label')
+        self._schedule_preview(reset=True)
+        id_name = self.starting_id_name_entry.get().strip()
+        self.session_ids.update(
+            record.values[0] for record in self.all_records
+            if record.field_names and record.field_names[0] == id_name
+        )
+        if len(self.all_records):
+            self.status_label.config(text=f"Resumed session: {len(self.all_records)} records from {store.path}")
+    
+    def _sample_memory(self):
+        """Periodically record memory use against the record count."""
+        self.diagnostics.sample_memory(len(self.all_records))
+        self.root.after(self.MEMORY_SAMPLE_MS, self._sample_memory)
+    
+    def _show_diagnostics(self, event=None):
+        """Open a window with handler latency and memory statistics."""
+        window = tk.Toplevel(self.root)
+        window.title("CSV Populator Diagnostics")
+        window.geometry("560x360")
+        
+        text = tk.Text(window, wrap=tk.NONE, font=("Courier", 9))
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+        
+        def refresh():
+            self.diagnostics.sample_memory(len(self.all_records))
+            text.config(state=tk.NORMAL)
+            text.delete(1.0, tk.END)
+            text.insert(tk.END, self.diagnostics.format_report())
+            text.config(state=tk.DISABLED)
+        
+        def dump():
+            try:
+                path = self.diagnostics.dump()
+                self.status_label.config(text=f"Diagnostics written to: {path}")
+            except OSError as e:
+                self.status_label.config(text=f"Error writing diagnostics: {str(e)}")
+        
+        buttons = ttk.Frame(window)
+        buttons.pack(pady=(0, 10))
+        ttk.Button(buttons, text="Refresh", command=refresh).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(buttons, text="Dump JSON", command=dump).pack(side=tk.LEFT)
+        
+        refresh()
+    
     def _load_template(self):
         """Load a template file and populate fields."""
         try:
@@ -589,65 +1208,152 @@ class CSVPopulatorApp:
             if not filename:
                 return
             
-            # Clear existing fields
-            for pair in self.field_pairs:
-                pair['frame'].destroy()
-            self.field_pairs.clear()
+            self._apply_template(filename, clear_records=True)
             
-            self.all_records.clear()
-            self._update_csv_preview()
-            self.fields_frame.update_idletasks()
+        except Exception as e:
+            self.status_label.config(text=f"Error loading template: {str(e)}")
+    
+    def _apply_template(self, filename, clear_records=False):
+        """Show a template's fields, reusing the existing rows and the parsed template cache."""
+        try:
+            start_time = time.perf_counter()
             
-            # Load template data
             try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    template_data = json.load(f)
-                
-                if isinstance(template_data, list):
-                    field_names = template_data
-                elif isinstance(template_data, dict) and 'fields' in template_data:
-                    field_names = template_data['fields']
-                elif isinstance(template_data, dict):
-                    field_names = list(template_data.keys())
-                else:
-                    raise ValueError("Invalid JSON template format")
-                
+                template = self.template_cache.get(filename)
             except json.JSONDecodeError:
                 self.status_label.config(text="Invalid JSON file format")
                 return
+            field_names = template.field_names
             
             if not field_names:
                 self.status_label.config(text="No valid field names found in template")
                 return
             
-            # Create fields from template
-            for field_name in field_names:
-                if field_name:
-                    new_field, new_value = self._create_field_pair()
-                    new_field.insert(0, field_name)
+            if clear_records:
+                self.all_records.clear()
+                self._reset_saved_state()
+                self._schedule_preview(reset=True)
             
-            self._update_row_labels()
-            self.fields_frame.update_idletasks()
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+            # Existing rows are rebound to the new fields rather than rebuilt
+            self.field_rules = template.rules
+            self._create_field_pairs(field_names)
+            self._remember_session_state()
             
-            if self.field_pairs:
-                self.field_pairs[0]['value_entry'].focus_set()
+            if len(self.fields):
+                self.field_grid.focus_cell(0, VALUE)
             
-            self.status_label.config(text=f"Loaded template: {len(field_names)} fields from {os.path.basename(filename)}")
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            rules = f", {len(template.rules)} rules" if template.rules else ""
+            self.status_label.config(
+                text=f"Loaded template: {len(field_names)} fields{rules} from {os.path.basename(filename)} in {elapsed_ms:.0f} ms (Ctrl+Shift+T to switch)"
+            )
             
         except Exception as e:
             self.status_label.config(text=f"Error loading template: {str(e)}")
     
+    def _show_template_switcher(self, event=None):
+        """Pop up the recently used templates; picking one keeps the session's records."""
+        menu = tk.Menu(self.root, tearoff=0)
+        recent = self.template_cache.recent()
+        for i, path in enumerate(recent[:9], 1):
+            menu.add_command(
+                label=f"{i}  {os.path.basename(path)}",
+                underline=0,
+                command=lambda path=path: self._apply_template(path)
+            )
+        if not recent:
+            menu.add_command(label="No recent templates", state="disabled")
+        menu.add_separator()
+        menu.add_command(label="Load Template...", command=self._load_template)
+        
+        try:
+            menu.tk_popup(self.fields_frame.winfo_rootx() + 20, self.fields_frame.winfo_rooty() + 20)
+        finally:
+            menu.grab_release()
+        return "break"
+    
+    def _resume_from_file(self):
+        """Continue an existing output file from its last record's ID and fields."""
+        try:
+            from tkinter import filedialog
+            from resume import read_resume_point
+            
+            output_path = os.path.abspath(self._get_output_path())
+            filename = filedialog.askopenfilename(
+                title="Select Output File to Resume",
+                initialdir=os.path.dirname(output_path),
+                initialfile=os.path.basename(output_path),
+                filetypes=[
+                    ("CSV files", "*.csv"),
+                    ("All files", "*.*")
+                ]
+            )
+            
+            if not filename:
+                return
+            if not is_plain_csv(filename):
+                self.status_label.config(text="Only uncompressed .csv output files can be resumed")
+                return
+            
+            # Session records not yet on disk are saved before the session is replaced;
+            # the resume waits until that save has succeeded
+            unsaved = len(self.all_records) - self.autosave_mark
+            if unsaved > 0:
+                self._submit_save()
+                self.status_label.config(
+                    text=f"Saving {unsaved} unsaved records to {os.path.basename(self._get_output_path())} first - resume again once saved"
+                )
+                return
+            
+            start_time = time.perf_counter()
+            
+            # Only the end of the file is read, however large it is
+            point = read_resume_point(filename, csv_format=self.csv_format)
+            if point is None:
+                self.status_label.config(text=f"No records found at the end of {os.path.basename(filename)}")
+                return
+            next_id = increment_id(point.last_id, self.ID_STEP)
+            
+            # Grouped files cannot be appended to, so continue them with a header per record
+            layout = point.layout if point.layout == LAYOUT_UNIFIED and not self.shared else LAYOUT_RECORDS
+            
+            self.all_records.clear()
+            self._reset_saved_state()
+            self.save_worker.adopt(filename, layout, point.columns if layout == LAYOUT_UNIFIED else None)
+            self._schedule_preview(reset=True)
+            
+            for name, value in self.EXPORT_LAYOUTS.items():
+                if value == layout:
+                    self.layout_combo.set(name)
+            
+            self.starting_id_name_entry.delete(0, tk.END)
+            self.starting_id_name_entry.insert(0, point.id_name)
+            self.starting_id_number_entry.delete(0, tk.END)
+            self.starting_id_number_entry.insert(0, next_id)
+            self.filename_entry.delete(0, tk.END)
+            self.filename_entry.insert(0, filename)
+            
+            self._create_field_pairs(point.field_names)
+            self.redraw.mark('id_label')
+            self._remember_session_state()
+            
+            if len(self.fields):
+                self.field_grid.focus_cell(0, VALUE)
+            
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            self.status_label.config(
+                text=f"Resumed {os.path.basename(filename)} after ID {point.last_id}: next ID {next_id} ({elapsed_ms:.0f} ms)"
+            )
+            
+        except Exception as e:
+            self.status_label.config(text=f"Error resuming file: {str(e)}")
+    
     def _save_template(self):
-        """Save current field names as a template file."""
+        """Save current field names, and the rules loaded for them, as a template file."""
         try:
             from tkinter import filedialog
             
-            field_names = []
-            for pair in self.field_pairs:
-                field_name = pair['field_entry'].get().strip()
-                if field_name:
-                    field_names.append(field_name)
+            field_names = [field_name for field_name, value in self.fields.pairs() if field_name]
             
             if not field_names:
                 self.status_label.config(text="No field names to save as template")
@@ -670,6 +1376,9 @@ class CSVPopulatorApp:
                 "description": f"Template created on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
                 "field_count": len(field_names)
             }
+            rules = {name: self.field_rules[name].spec for name in field_names if name in self.field_rules}
+            if rules:
+                template_data["rules"] = rules
             
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(template_data, f, indent=2, ensure_ascii=False)
@@ -681,31 +1390,104 @@ class CSVPopulatorApp:
     
     def _clear_all_fields(self):
         """Clear all field entries and reset to initial state."""
-        for pair in self.field_pairs:
-            pair['field_entry'].delete(0, tk.END)
-            pair['value_entry'].delete(0, tk.END)
-        
-        while len(self.field_pairs) > 1:
-            self._delete_field_pair(len(self.field_pairs) - 1)
+        self.fields.reset([''])
+        self.field_rules = {}
+        self._revalidate_all()
+        self._update_row_labels()
         
         self.all_records.clear()
-        self._update_csv_preview()
+        self._reset_saved_state()
+        self._schedule_preview(reset=True)
         
         # Reset filename to desktop path
         self.filename_entry.delete(0, tk.END)
         default_filename = os.path.join(self._get_desktop_path(), "output.csv")
         self.filename_entry.insert(0, default_filename)
         
-        if self.field_pairs:
-            self.field_pairs[0]['field_entry'].focus_set()
+        self.field_grid.focus_cell(0, FIELD)
         
         self.status_label.config(text="All fields cleared")
 
 
 def main():
     """Main application entry point."""
+    parser = argparse.ArgumentParser(description="CSV data entry application")
+    parser.add_argument(
+        '--diagnostics',
+        nargs='?',
+        const='',
+        default=os.environ.get('CSV_POPULATOR_DIAGNOSTICS'),
+        metavar='JSON_PATH',
+        help="Time event handlers and dump statistics on exit (Ctrl+Shift+D shows them)"
+    )
+    parser.add_argument(
+        '--session',
+        nargs='?',
+        const=DEFAULT_SESSION_FILE,
+        default=os.environ.get('CSV_POPULATOR_SESSION'),
+        metavar='SQLITE_PATH',
+        help="Keep records in a crash-safe SQLite session file and resume it on the next launch"
+    )
+    parser.add_argument(
+        '--shared',
+        action='store_true',
+        default=bool(os.environ.get('CSV_POPULATOR_SHARED')),
+        help="Share the output file with other running instances: lock appends and lease IDs"
+    )
+    parser.add_argument(
+        '--startup-report',
+        nargs='?',
+        const='',
+        default=os.environ.get('CSV_POPULATOR_STARTUP_REPORT'),
+        metavar='JSON_PATH',
+        help="Report the time to first paint and to an interactive window (stderr if no path)"
+    )
+    parser.add_argument(
+        '--record',
+        default=os.environ.get('CSV_POPULATOR_RECORD'),
+        metavar='PATH',
+        help="Record input events (including typed values) to PATH for replay.py"
+    )
+    parser.add_argument(
+        '--quit-after-startup',
+        action='store_true',
+        help="Close as soon as the window is interactive (for start-up benchmarks)"
+    )
+    add_format_arguments(parser)
+    args, _ = parser.parse_known_args()
+    
+    try:
+        csv_format = format_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    startup = None
+    if args.startup_report is not None:
+        startup = StartupTimer(STARTUP_STARTED, dump_path=args.startup_report or None)
+        startup.mark('imports')
+    
+    diagnostics = None
+    if args.diagnostics is not None:
+        from instrumentation import Instrumentation
+        diagnostics = Instrumentation(dump_path=args.diagnostics or None)
+    
+    recorder = None
+    if args.record:
+        from recorder import InputRecorder
+        recorder = InputRecorder(args.record)
+    
     root = tk.Tk()
-    app = CSVPopulatorApp(root)
+    app = CSVPopulatorApp(
+        root,
+        diagnostics=diagnostics,
+        session_path=args.session,
+        shared=args.shared,
+        startup=startup,
+        csv_format=csv_format,
+        recorder=recorder
+    )
+    if startup and args.quit_after_startup:
+        startup.on_interactive = app._on_close
     
     try:
         root.iconbitmap('icon.ico')
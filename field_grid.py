@@ -0,0 +1,441 @@
+import tkinter as tk
+from bisect import bisect_left
+from tkinter import ttk
+
+
+FIELD = 'field'
+VALUE = 'value'
+
+
+class FieldModel:
+    """Plain list of field name/value rows shown by the field grid.
+
+    Alongside the text, the model keeps ``empty``: a sorted list of the cells
+    whose stripped text is empty, encoded as ``index * 2`` for a field name and
+    ``index * 2 + 1`` for a value.  It is updated as cells change, so finding
+    the next or topmost empty cell is a binary search instead of a scan.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.values = []
+        self.empty = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, name='', value=''):
+        """Add a row and return its index."""
+        index = len(self.names)
+        self.names.append(name)
+        self.values.append(value)
+        for role, text in ((FIELD, name), (VALUE, value)):
+            if not text.strip():
+                self.empty.append(_cell_key(index, role))
+        return index
+
+    def delete(self, index):
+        """Remove the row at index."""
+        del self.names[index]
+        del self.values[index]
+
+        # Drop the row's keys and shift the keys of later rows up by one row
+        start = bisect_left(self.empty, index * 2)
+        stop = bisect_left(self.empty, index * 2 + 2)
+        self.empty[start:] = [key - 2 for key in self.empty[stop:]]
+
+    def get(self, index, role):
+        """Return the raw text of a cell."""
+        return self.names[index] if role == FIELD else self.values[index]
+
+    def set(self, index, role, text):
+        """Set the text of a cell."""
+        if role == FIELD:
+            self.names[index] = text
+        else:
+            self.values[index] = text
+
+        key = _cell_key(index, role)
+        position = bisect_left(self.empty, key)
+        is_listed = position < len(self.empty) and self.empty[position] == key
+        if text.strip():
+            if is_listed:
+                del self.empty[position]
+        elif not is_listed:
+            self.empty.insert(position, key)
+
+    def is_empty(self, index, role):
+        """True if the cell holds only whitespace."""
+        return not self.get(index, role).strip()
+
+    def first_empty(self, index=0, role=FIELD):
+        """Return the first empty cell at or after (index, role) as (index, role), or None."""
+        position = bisect_left(self.empty, _cell_key(index, role))
+        if position == len(self.empty):
+            return None
+        key = self.empty[position]
+        return key // 2, FIELD if key % 2 == 0 else VALUE
+
+    def clear_values(self):
+        """Blank every value, keeping the field names."""
+        self.values = [''] * len(self.names)
+        self._rebuild_empty()
+
+    def reset(self, names=()):
+        """Replace all rows with the given field names and empty values."""
+        self.names = list(names)
+        self.values = [''] * len(self.names)
+        self._rebuild_empty()
+
+    def pairs(self):
+        """Iterate over stripped (name, value) pairs."""
+        return ((name.strip(), value.strip()) for name, value in zip(self.names, self.values))
+
+    def _rebuild_empty(self):
+        """Recompute the empty-cell list from scratch."""
+        self.empty = []
+        for index, (name, value) in enumerate(zip(self.names, self.values)):
+            if not name.strip():
+                self.empty.append(index * 2)
+            if not value.strip():
+                self.empty.append(index * 2 + 1)
+
+
+def _cell_key(index, role):
+    """Sort key of a cell in FieldModel.empty."""
+    return index * 2 + (0 if role == FIELD else 1)
+
+
+class _RowSlot:
+    """Recycled widgets for one on-screen row of the grid."""
+
+    def __init__(self, grid):
+        self.index = None
+        self.hidden = True
+        self.frame = ttk.Frame(grid.canvas)
+        self.frame.columnconfigure(0, weight=0)
+        self.frame.columnconfigure(1, weight=1)
+        self.frame.columnconfigure(2, weight=0)
+        self.frame.columnconfigure(3, weight=1)
+        self.frame.columnconfigure(4, weight=0)
+
+        self.row_label = ttk.Label(self.frame, text="", width=9)
+        self.row_label.grid(row=0, column=0, padx=(0, 10), sticky=tk.W)
+
+        self.field_var = tk.StringVar()
+        self.field_entry = ttk.Entry(self.frame, width=30, textvariable=self.field_var)
+        self.field_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 4))
+
+        # Validation marker for the value, shown when the grid has an error for the row
+        self.marker = ttk.Label(self.frame, text="", width=2, foreground="red", font=("Arial", 10, "bold"))
+        self.marker.grid(row=0, column=2, padx=(0, 2))
+
+        self.value_var = tk.StringVar()
+        self.value_entry = ttk.Entry(self.frame, width=30, textvariable=self.value_var)
+        self.value_entry.grid(row=0, column=3, sticky=(tk.W, tk.E), padx=(0, 10))
+
+        self.delete_btn = ttk.Button(
+            self.frame,
+            text="×",
+            width=3,
+            command=lambda: grid._on_delete_clicked(self)
+        )
+        self.delete_btn.grid(row=0, column=4, padx=(10, 0))
+
+        self.window_id = grid.canvas.create_window(
+            (0, grid.HIDDEN_Y), window=self.frame, anchor="nw", width=grid.canvas.winfo_width()
+        )
+
+    def entry(self, role):
+        """Return the Entry widget for a role."""
+        return self.field_entry if role == FIELD else self.value_entry
+
+
+class FieldGrid:
+    """Virtualized field name/value grid on a canvas.
+
+    Only the rows inside the visible part of the canvas, plus ``overscan``
+    rows on each side, have widgets.  Those widgets come from a pool of
+    ``_RowSlot`` objects that are re-pointed at different model rows as the
+    view scrolls, so a template with thousands of fields needs only a few dozen
+    widgets.  Edits flow into the ``FieldModel`` through StringVar traces and
+    are reported to ``on_edit``.  ``markers`` maps row index to a validation
+    message, shown as a marker beside the row's value.  Given a
+    ``RedrawScheduler``, refreshes and resizes are coalesced into one idle
+    redraw of the 'field_rows' part.
+    """
+
+    DEFAULT_ROW_HEIGHT = 30
+    HIDDEN_Y = -1000
+
+    def __init__(self, parent, model, on_tab, on_enter, on_delete, on_edit=None, scheduler=None, overscan=3):
+        self.model = model
+        self.on_tab = on_tab
+        self.on_enter = on_enter
+        self.on_delete = on_delete
+        self.on_edit = on_edit
+        self.scheduler = scheduler
+        self.overscan = overscan
+        if scheduler:
+            scheduler.register('field_rows', self._redraw)
+
+        self.canvas = tk.Canvas(parent, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_canvas_scroll)
+
+        self.slots = []
+        self.slot_by_widget = {}
+        self.markers = {}
+        self.row_height = None
+        self._binding = False
+        self._stale = False
+        self._parked_focus = None
+
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
+        self.canvas.bind("<FocusOut>", lambda e: self._clear_parked_focus())
+        self.bind_scroll_wheel(self.canvas)
+
+    def bind_scroll_wheel(self, widget):
+        """Route mouse wheel events over widget to the grid."""
+        widget.bind("<MouseWheel>", self._on_mousewheel)
+        widget.bind("<Button-4>", self._on_mousewheel)
+        widget.bind("<Button-5>", self._on_mousewheel)
+
+    def cell_of(self, widget):
+        """Return the (index, role) shown by a grid entry widget, or None."""
+        slot_role = self.slot_by_widget.get(str(widget))
+        if slot_role is None:
+            return None
+        slot, role = slot_role
+        if slot.index is None:
+            return None
+        return slot.index, role
+
+    def focused_cell(self):
+        """Return the (index, role) of the grid entry holding focus, or None.
+
+        Reads Tk's focus path, since focus_get() raises KeyError while a
+        widget Tkinter did not create (e.g. a combobox popdown) has focus.
+        """
+        return self.cell_of(self.canvas.tk.call('focus'))
+
+    def refresh(self):
+        """Rebind every visible row to the model, e.g. after bulk model changes."""
+        self._stale = True
+        if self.scheduler:
+            self.scheduler.mark('field_rows')
+        else:
+            self._redraw()
+
+    def set_marker(self, index, message):
+        """Mark row index as invalid with message, or clear its marker if message is None."""
+        if message:
+            self.markers[index] = message
+        elif self.markers.pop(index, None) is None:
+            return
+        for slot in self.slots:
+            if slot.index == index:
+                slot.marker.config(text="!" if message else "")
+
+    def clear_markers(self):
+        """Remove every validation marker."""
+        self.markers.clear()
+        for slot in self.slots:
+            slot.marker.config(text="")
+
+    def scroll_to_top(self):
+        """Scroll back to the first row."""
+        self._flush()
+        self.canvas.yview_moveto(0.0)
+        self._render()
+
+    def scroll_to_end(self):
+        """Scroll so the last row is visible."""
+        self._flush()
+        self.canvas.yview_moveto(1.0)
+        self._render()
+
+    def focus_cell(self, index, role):
+        """Scroll row index into view and give focus to its entry."""
+        self._flush()
+        self._see(index)
+        self._render()
+        entry = self.entry_for(index, role)
+        if entry is not None:
+            self._clear_parked_focus()
+            entry.focus_set()
+
+    def entry_for(self, index, role):
+        """Return the entry widget showing a cell, or None if its row is not rendered."""
+        for slot in self.slots:
+            if slot.index == index:
+                return slot.entry(role)
+        return None
+
+    def _see(self, index):
+        """Adjust the view so row index is fully visible."""
+        row_height = self._row_height()
+        total = max(len(self.model) * row_height, 1)
+        view_top = self.canvas.canvasy(0)
+        view_height = self.canvas.winfo_height()
+        row_top = index * row_height
+
+        if row_top < view_top:
+            self.canvas.yview_moveto(row_top / total)
+        elif row_top + row_height > view_top + view_height:
+            self.canvas.yview_moveto(max(0, row_top + row_height - view_height) / total)
+
+    def _redraw(self):
+        """Resize the scroll region to the model and render the view."""
+        self._update_scrollregion()
+        self._render()
+
+    def _flush(self):
+        """Apply a pending scheduled redraw before scrolling against the scroll region."""
+        if self.scheduler:
+            self.scheduler.flush('field_rows')
+
+    def _render(self):
+        """Point pool rows at the model rows inside the view plus overscan."""
+        row_height = self._row_height()
+        force = self._stale
+        self._stale = False
+        count = len(self.model)
+        view_top = max(0, int(self.canvas.canvasy(0)))
+        view_height = max(self.canvas.winfo_height(), row_height)
+
+        first = max(0, view_top // row_height - self.overscan)
+        last = min(count, (view_top + view_height) // row_height + 1 + self.overscan)
+        wanted = range(first, last)
+
+        while len(self.slots) < len(wanted):
+            self._add_slot()
+
+        # Keep slots that already show a wanted row, recycle the rest
+        free = []
+        shown = set()
+        for slot in self.slots:
+            if slot.index is not None and first <= slot.index < last and slot.index not in shown:
+                if force:
+                    self._bind_slot(slot, slot.index)
+                shown.add(slot.index)
+            else:
+                free.append(slot)
+
+        for index in wanted:
+            if index not in shown:
+                self._bind_slot(free.pop(), index)
+
+        for slot in free:
+            if not slot.hidden:
+                self._bind_slot(slot, None)
+
+    def _bind_slot(self, slot, index):
+        """Show model row index (or nothing) in a pooled slot."""
+        focused = str(self.canvas.tk.call('focus'))
+        for role in (FIELD, VALUE):
+            if focused == str(slot.entry(role)) and slot.index is not None and slot.index != index:
+                # Park focus on the canvas while the row is off screen
+                self._parked_focus = (slot.index, role)
+                self.canvas.focus_set()
+
+        slot.index = index
+        slot.hidden = index is None
+        self._binding = True
+        try:
+            if index is None:
+                slot.field_var.set('')
+                slot.value_var.set('')
+                slot.marker.config(text="")
+                self.canvas.coords(slot.window_id, 0, self.HIDDEN_Y)
+                return
+
+            slot.row_label.config(text=f"Row {index + 1}:")
+            slot.field_var.set(self.model.names[index])
+            slot.value_var.set(self.model.values[index])
+            slot.marker.config(text="!" if index in self.markers else "")
+            self.canvas.coords(slot.window_id, 0, index * self._row_height())
+        finally:
+            self._binding = False
+
+        if self._parked_focus and self._parked_focus[0] == index:
+            role = self._parked_focus[1]
+            self._parked_focus = None
+            slot.entry(role).focus_set()
+
+    def _add_slot(self):
+        """Create one more pooled row."""
+        slot = _RowSlot(self)
+        self.slots.append(slot)
+
+        for role in (FIELD, VALUE):
+            entry = slot.entry(role)
+            self.slot_by_widget[str(entry)] = (slot, role)
+            entry.bind('<Tab>', self.on_tab)
+            entry.bind('<Return>', self.on_enter)
+            self.bind_scroll_wheel(entry)
+
+        slot.field_var.trace_add('write', lambda *args: self._on_var_write(slot, FIELD))
+        slot.value_var.trace_add('write', lambda *args: self._on_var_write(slot, VALUE))
+        for widget in (slot.frame, slot.row_label, slot.marker, slot.delete_btn):
+            self.bind_scroll_wheel(widget)
+        return slot
+
+    def _on_var_write(self, slot, role):
+        """Copy user edits from a slot entry into the model."""
+        if self._binding or slot.index is None:
+            return
+        var = slot.field_var if role == FIELD else slot.value_var
+        self.model.set(slot.index, role, var.get())
+        if self.on_edit:
+            self.on_edit(slot.index, role)
+
+    def _on_delete_clicked(self, slot):
+        """Forward a delete button press for whichever row the slot shows."""
+        if slot.index is not None:
+            self.on_delete(slot.index)
+
+    def _row_height(self):
+        """Measure the pixel height of one row, once."""
+        if self.row_height is None:
+            # Renders triggered while measuring use the default height
+            self.row_height = self.DEFAULT_ROW_HEIGHT
+            if not self.slots:
+                self._add_slot()
+            self.canvas.update_idletasks()
+            self.row_height = self.slots[0].frame.winfo_reqheight() or self.DEFAULT_ROW_HEIGHT
+            self.canvas.configure(yscrollincrement=self.row_height)
+            self._stale = True
+        return self.row_height
+
+    def _update_scrollregion(self):
+        """Size the scroll region to the full model, rendered or not."""
+        height = len(self.model) * self._row_height()
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), height))
+
+    def _on_canvas_scroll(self, first, last):
+        """Keep the scrollbar in sync and render rows for the new view."""
+        self.scrollbar.set(first, last)
+        self._render()
+
+    def _on_canvas_configure(self, event):
+        """Stretch pooled rows to the canvas width and fill new space."""
+        for slot in self.slots:
+            self.canvas.itemconfigure(slot.window_id, width=event.width)
+        if self.scheduler:
+            self.scheduler.mark('field_rows')
+        else:
+            self._redraw()
+
+    def _on_mousewheel(self, event):
+        """Handle mouse wheel scrolling."""
+        if event.num == 4:
+            self.canvas.yview_scroll(-1, "units")
+        elif event.num == 5:
+            self.canvas.yview_scroll(1, "units")
+        else:
+            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+
+    def _clear_parked_focus(self):
+        """Forget focus parked on the canvas once it moves elsewhere."""
+        self._parked_focus = None
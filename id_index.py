@@ -0,0 +1,232 @@
+import math
+import os
+import queue
+import threading
+
+
+# Bytes of the output file indexed per update() call
+SCAN_CHUNK_BYTES = 128 << 10
+
+# Room left in the first Bloom filter for IDs appended after the file was first indexed
+CAPACITY_HEADROOM = 1.25
+
+# Seconds between checks for new lines once the index has caught up with its file
+POLL_SECONDS = 0.2
+
+
+class BloomFilter:
+    """Fixed-size, in-memory Bloom filter over byte strings.
+
+    Bit positions come from the built-in hash, which is randomized per
+    process, so the filter must not be persisted.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add(self, key):
+        bits = self.bits
+        size = self.size
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        # Double hashing: position i is h1 + i * h2
+        position, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        for _ in range(self.hashes):
+            position %= size
+            bits[position >> 3] |= 1 << (position & 7)
+            position += h2
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        size = self.size
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        position, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        for _ in range(self.hashes):
+            position %= size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            position += h2
+        return True
+
+
+class ScalableBloomFilter:
+    """Bloom filters chained as they fill, so the number of keys need not be known.
+
+    Each new filter doubles the capacity and halves the error rate, keeping
+    the overall false-positive rate below twice the initial one.
+    """
+
+    def __init__(self, initial_capacity=1 << 16, error_rate=0.001):
+        self.error_rate = error_rate
+        self.filters = [BloomFilter(initial_capacity, error_rate / 2)]
+
+    def add(self, key):
+        current = self.filters[-1]
+        if current.count >= current.capacity:
+            current = BloomFilter(current.capacity * 2, self.error_rate / 2 ** (len(self.filters) + 1))
+            self.filters.append(current)
+        current.add(key)
+
+    def __contains__(self, key):
+        return any(key in bloom for bloom in self.filters)
+
+    def __len__(self):
+        return sum(bloom.count for bloom in self.filters)
+
+
+class OutputIDIndex:
+    """IDs present in an output CSV, indexed incrementally as the file grows.
+
+    update() indexes the file in bounded steps from where it stopped.  An
+    index only ever grows: once the file it started on is replaced or
+    truncated, replaced() says so and update() stops, and a new index has to
+    be built while this one keeps answering lookups.  Lookups go through a
+    Bloom filter: a miss is certain, a hit means the ID is almost certainly
+    present.  The first filter is sized from the file size and the share of
+    ID lines in the first chunk, so a file indexed in one go costs about 20
+    bits per ID.
+    """
+
+    def __init__(self, path, id_name, delimiter=','):
+        self.path = path
+        self.id_name = id_name.encode('utf-8')
+        self.delimiter = delimiter.encode('utf-8')
+        self.identity = None
+        self.offset = 0
+        self.ids = None
+
+    def replaced(self):
+        """True if the file indexed so far was replaced, truncated or removed."""
+        if self.identity is None:
+            return False
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return True
+        return (st.st_dev, st.st_ino) != self.identity or st.st_size < self.offset
+
+    def update(self, max_bytes=SCAN_CHUNK_BYTES):
+        """Index up to max_bytes of new lines; return True once the whole file is indexed."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return True
+
+        identity = (st.st_dev, st.st_ino)
+        if self.identity is None:
+            self.identity = identity
+        elif identity != self.identity or st.st_size < self.offset:
+            # Replaced: the caller builds a new index (see replaced())
+            return True
+        if self.offset >= st.st_size:
+            return True
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read(max_bytes)
+        end = chunk.rfind(b'\n') + 1
+        if end == 0:
+            # Only part of a line so far; index it once it is complete (or skip a giant one)
+            if len(chunk) < max_bytes:
+                return True
+            end = len(chunk)
+
+        lines = chunk[:end].split(b'\n')
+        if self.offset == 0 and lines[0].startswith(b'\xef\xbb\xbf'):
+            lines[0] = lines[0][3:]
+        delimiter = self.delimiter
+        id_name = self.id_name
+        values = [line.split(delimiter, 1)[0].rstrip(b'\r') for line in lines]
+        values = [value for value in values if value and value != id_name]
+
+        ids = self.ids
+        if ids is None:
+            # Header lines take up part of the file but hold no IDs
+            expected = st.st_size * len(values) // end
+            ids = self.ids = ScalableBloomFilter(max(1 << 16, int(expected * CAPACITY_HEADROOM)))
+        for value in values:
+            ids.add(value)
+
+        self.offset += end
+        return self.offset >= st.st_size
+
+    def __contains__(self, record_id):
+        # Read once: the worker may create the filter between two reads
+        ids = self.ids
+        return ids is not None and record_id.encode('utf-8') in ids
+
+
+class IDIndexWorker:
+    """Keep an OutputIDIndex of the output file current on a background thread.
+
+    watch() names the file to index; a new file (or ID name) replaces the
+    index being built.  Once an index has caught up with its file it is
+    posted to ``events`` for the main thread to poll, and the worker keeps
+    extending it as the file grows.  When the file is replaced (every
+    rewriting save), a new index is built and posted once it has caught up;
+    until then the posted one keeps answering lookups:
+
+        ('ready', index)
+        ('error', path, exception)
+
+    After an error the file is indexed again from the start on the next poll.
+    """
+
+    def __init__(self, poll_seconds=POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.events = queue.Queue()
+        self._target = None
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="csv-id-index-worker", daemon=True)
+        self._thread.start()
+
+    def watch(self, path, id_name='', delimiter=','):
+        """Index path (None for no file) with the given ID name and delimiter."""
+        target = (path, id_name, delimiter) if path else None
+        with self._condition:
+            if target != self._target:
+                self._target = target
+                self._condition.notify()
+
+    def close(self, timeout=None):
+        """Stop the thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        target = None
+        index = None
+        posted = False
+        caught_up = True
+        while True:
+            with self._condition:
+                if caught_up and self._target == target and not self._closed:
+                    self._condition.wait(self.poll_seconds if target else None)
+                if self._closed:
+                    return
+                if self._target != target:
+                    target = self._target
+                    index = None
+            if target is None:
+                caught_up = True
+                continue
+
+            try:
+                if index is None or (posted and index.replaced()):
+                    index = OutputIDIndex(*target)
+                    posted = False
+                caught_up = index.update()
+                if caught_up and not posted:
+                    self.events.put(('ready', index))
+                    posted = True
+            except Exception as e:
+                index = None
+                caught_up = True
+                self.events.put(('error', target[0], e))
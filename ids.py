@@ -0,0 +1,110 @@
+import re
+
+
+# The last run of digits is the counter; everything around it is kept verbatim
+ID_PATTERN = re.compile(r'^(.*\D)?(\d+)(\D*)$')
+
+
+class IDFormat:
+    """Parsed ID of the form prefix + zero-padded number + suffix.
+
+    ``WO-0099`` parses to prefix ``WO-``, number 99 and width 4, so the next
+    ID is ``WO-0100``.  ``A12B7`` counts on its last digit run (``A12B8``).
+    Numbers that outgrow the width simply get longer.
+    """
+
+    __slots__ = ('prefix', 'number', 'width', 'suffix')
+
+    def __init__(self, prefix, number, width, suffix=''):
+        self.prefix = prefix
+        self.number = number
+        self.width = width
+        self.suffix = suffix
+
+    @classmethod
+    def parse(cls, text):
+        """Return the IDFormat for text, or None if it has no digits."""
+        match = ID_PATTERN.match(text or '')
+        if not match:
+            return None
+        prefix, digits, suffix = match.groups()
+        return cls(prefix or '', int(digits), len(digits), suffix)
+
+    def format(self, number):
+        """Render number in this ID's format."""
+        return f"{self.prefix}{number:0{self.width}d}{self.suffix}"
+
+    def __str__(self):
+        return self.format(self.number)
+
+
+class IDBlock:
+    """A contiguous run of IDs, formatted lazily on access."""
+
+    __slots__ = ('id_format', 'numbers')
+
+    def __init__(self, id_format, numbers):
+        self.id_format = id_format
+        self.numbers = numbers
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __iter__(self):
+        format_id = self.id_format.format
+        for number in self.numbers:
+            yield format_id(number)
+
+    def __getitem__(self, index):
+        return self.id_format.format(self.numbers[index])
+
+
+class IDAllocator:
+    """Hands out IDs following a starting ID's format, step apart.
+
+    The starting ID is parsed once.  allocate() reserves a whole block in
+    constant time, so bulk operations do not format IDs they never use.
+    """
+
+    def __init__(self, start_id, step=1):
+        if step < 1:
+            raise ValueError("ID step must be at least 1")
+        id_format = IDFormat.parse(start_id)
+        if id_format is None:
+            raise ValueError(f"Cannot increment ID format: {start_id}")
+        self.id_format = id_format
+        self.step = step
+        self.next_number = id_format.number
+
+    @property
+    def current(self):
+        """The ID the next call to next() will return."""
+        return self.id_format.format(self.next_number)
+
+    def next(self):
+        """Return the current ID and advance past it."""
+        current = self.current
+        self.next_number += self.step
+        return current
+
+    def allocate(self, count):
+        """Reserve the next count IDs and return them as an IDBlock."""
+        if count < 0:
+            raise ValueError("count must not be negative")
+        start = self.next_number
+        self.next_number += count * self.step
+        return IDBlock(self.id_format, range(start, self.next_number, self.step))
+
+
+def increment_id(current_id, step=1):
+    """Return the ID step after current_id, keeping its prefix, suffix and padding.
+
+    IDs without digits are returned unchanged, and empty IDs give None.
+    """
+    if not current_id:
+        return None
+
+    id_format = IDFormat.parse(current_id)
+    if id_format is None:
+        return current_id
+    return id_format.format(id_format.number + step)
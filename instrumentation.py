@@ -0,0 +1,156 @@
+import functools
+import json
+import math
+import time
+import tracemalloc
+
+
+class HandlerStats:
+    """Call count and log2-bucketed latency histogram for one handler."""
+
+    # Bucket i counts calls that took less than 2**i microseconds
+    BUCKETS = 32
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * self.BUCKETS
+
+    def add(self, seconds):
+        """Record one call duration."""
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        micros = seconds * 1e6
+        bucket = 0 if micros < 1 else min(self.BUCKETS - 1, int(math.log2(micros)) + 1)
+        self.histogram[bucket] += 1
+
+    def percentile(self, fraction):
+        """Upper bound, in seconds, of the bucket holding the given fraction of calls."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bucket, hits in enumerate(self.histogram):
+            seen += hits
+            if seen >= target:
+                return min(2 ** bucket / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        """Return the statistics as a JSON-friendly dict in milliseconds."""
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "p50_ms": self.percentile(0.50) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "max_ms": self.max * 1000,
+            "total_ms": self.total * 1000
+        }
+
+
+class Instrumentation:
+    """Opt-in latency and memory instrumentation for CSVPopulatorApp.
+
+    Handlers are wrapped per instance by instrument(), so when diagnostics are
+    off nothing is wrapped and there is no overhead at all.
+    """
+
+    # Keep the memory timeline bounded for day-long sessions
+    MAX_MEMORY_SAMPLES = 500
+
+    def __init__(self, dump_path=None):
+        self.dump_path = dump_path
+        self.started = time.time()
+        self.stats = {}
+        self.memory_samples = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def instrument(self, obj, names):
+        """Replace the named bound methods of obj with timed wrappers."""
+        for name in names:
+            setattr(obj, name, self.wrap(name, getattr(obj, name)))
+
+    def wrap(self, name, func):
+        """Return func wrapped to record its latency under name."""
+        stats = self.stats.setdefault(name, HandlerStats())
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.add(time.perf_counter() - start)
+
+        return timed
+
+    def sample_memory(self, record_count):
+        """Record traced memory alongside the record-store size."""
+        current, peak = tracemalloc.get_traced_memory()
+        self.memory_samples.append({
+            "elapsed_s": round(time.time() - self.started, 1),
+            "records": record_count,
+            "traced_mb": current / 2**20,
+            "peak_mb": peak / 2**20
+        })
+        if len(self.memory_samples) > self.MAX_MEMORY_SAMPLES:
+            # Thin out the older half so the timeline still spans the session
+            half = len(self.memory_samples) // 2
+            self.memory_samples[:half] = self.memory_samples[:half:2]
+
+    def top_allocations(self, limit=10):
+        """Return the source lines holding the most traced memory."""
+        snapshot = tracemalloc.take_snapshot()
+        return [
+            {"location": str(stat.traceback), "size_kb": stat.size / 1024, "blocks": stat.count}
+            for stat in snapshot.statistics('lineno')[:limit]
+        ]
+
+    def report(self, include_allocations=False):
+        """Return all collected statistics as a dict."""
+        report = {
+            "uptime_s": round(time.time() - self.started, 1),
+            "handlers": {name: stats.summary() for name, stats in sorted(self.stats.items())},
+            "memory": self.memory_samples[-1] if self.memory_samples else None,
+            "memory_timeline": self.memory_samples
+        }
+        if include_allocations:
+            report["top_allocations"] = self.top_allocations()
+        return report
+
+    def format_report(self):
+        """Return a plain-text table for the diagnostics window."""
+        lines = [f"Uptime: {time.time() - self.started:.0f} s", ""]
+        lines.append(f"{'Handler':<24}{'calls':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for name, stats in sorted(self.stats.items()):
+            summary = stats.summary()
+            lines.append(
+                f"{name:<24}{summary['count']:>8}{summary['p50_ms']:>10.2f}"
+                f"{summary['p95_ms']:>10.2f}{summary['max_ms']:>10.2f}"
+            )
+        if self.memory_samples:
+            sample = self.memory_samples[-1]
+            lines.append("")
+            lines.append(
+                f"Memory: {sample['traced_mb']:.1f} MB traced (peak {sample['peak_mb']:.1f} MB) "
+                f"with {sample['records']} records"
+            )
+        return '\n'.join(lines)
+
+    def dump(self, path=None):
+        """Write the report, including top allocations, as JSON."""
+        path = path or self.dump_path
+        if not path:
+            return None
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(include_allocations=True), f, indent=2)
+        return path
@@ -0,0 +1,189 @@
+import mmap
+import os
+import threading
+from bisect import bisect_right
+from contextlib import contextmanager
+
+
+# A checkpoint is kept for every LINE_STRIDE-th line
+LINE_STRIDE = 1024
+
+# Bytes read from one mapping while indexing; the file is unmapped between
+# chunks so saves can still replace it (Windows refuses while it is mapped)
+INDEX_CHUNK_BYTES = 4 << 20
+SCAN_BLOCK_BYTES = 64 << 10
+
+# Longest stretch counted line by line to number an offset past the last checkpoint
+MAX_UNINDEXED_BYTES = 8 << 20
+
+
+@contextmanager
+def map_file(path, missing_ok=False):
+    """Memory-map path read-only for the duration of the block.
+
+    Yields None for an empty file, and for a missing one if missing_ok is set.
+    """
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        if not missing_ok:
+            raise
+        yield None
+        return
+    with f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            yield None
+            return
+    with data:
+        yield data
+
+
+def line_start(data, offset):
+    """Offset of the start of the line containing offset."""
+    return data.rfind(b'\n', 0, max(0, offset)) + 1 if offset > 0 else 0
+
+
+def next_line(data, offset):
+    """Offset of the start of the line after the one at offset (the file size at the end)."""
+    end = data.find(b'\n', offset)
+    return len(data) if end < 0 else end + 1
+
+
+def lines_back(data, offset, count):
+    """Offset of the line count lines above the line starting at offset."""
+    for _ in range(count):
+        if offset <= 0:
+            return 0
+        offset = line_start(data, offset - 1)
+    return offset
+
+
+def last_page(data, count):
+    """Offset of the first of the last count lines."""
+    end = len(data)
+    if end and data[end - 1:end] == b'\n':
+        end -= 1
+    return lines_back(data, line_start(data, end), count - 1)
+
+
+def read_lines(data, offset, count):
+    """Return up to count decoded lines starting at offset, and the offset after them."""
+    lines = []
+    while len(lines) < count and offset < len(data):
+        end = next_line(data, offset)
+        lines.append(data[offset:end].rstrip(b'\r\n').decode('utf-8', errors='replace'))
+        offset = end
+    return lines, offset
+
+
+class SparseLineIndex:
+    """Offsets of every stride-th line of a file, built on a background thread.
+
+    checkpoints[k] is where line k * stride starts (lines count from 0), so
+    finding any line means one lookup plus a scan of at most stride lines.
+    The index covers the first ``scanned`` bytes and catches up with a
+    growing file when started again; a replaced or truncated file is indexed
+    from the start.
+    """
+
+    def __init__(self, path, stride=LINE_STRIDE):
+        self.path = path
+        self.stride = stride
+        self._thread = None
+        self._stop = threading.Event()
+        self._reset(None)
+
+    @property
+    def complete(self):
+        """True once every byte of the file, as last seen, is indexed."""
+        return self.size is not None and self.scanned >= self.size
+
+    @property
+    def line_count(self):
+        """Number of lines in the indexed part of the file."""
+        return self.lines + (1 if self.partial else 0)
+
+    def start(self):
+        """Index new bytes of the file on a background thread, unless that is already running."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="csv-line-index", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Ask the indexing thread to stop after its current chunk."""
+        self._stop.set()
+
+    def offset_of(self, data, line):
+        """Offset where line starts, or None if that line is not indexed yet."""
+        k = line // self.stride
+        checkpoints = self.checkpoints
+        if line < 0 or k >= len(checkpoints) or line >= self.line_count:
+            return None
+        offset = checkpoints[k]
+        for _ in range(line - k * self.stride):
+            offset = next_line(data, offset)
+        return offset
+
+    def line_of(self, data, offset):
+        """Line number of the line starting at offset, or None if it is too far past the index."""
+        checkpoints = self.checkpoints
+        k = bisect_right(checkpoints, offset) - 1
+        start = checkpoints[k]
+        if offset - start > MAX_UNINDEXED_BYTES:
+            return None
+        return k * self.stride + data[start:offset].count(b'\n')
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                self._reset(None)
+                return
+
+            identity = (st.st_dev, st.st_ino)
+            if identity != self.identity or st.st_size < self.scanned:
+                self._reset(identity)
+            self.size = st.st_size
+            if self.complete:
+                return
+
+            try:
+                with map_file(self.path) as data:
+                    if data is None:
+                        return
+                    end = min(len(data), self.scanned + INDEX_CHUNK_BYTES)
+                    for offset in range(self.scanned, end, SCAN_BLOCK_BYTES):
+                        self._scan_block(data[offset:min(end, offset + SCAN_BLOCK_BYTES)], offset)
+            except OSError:
+                return
+
+    def _scan_block(self, block, offset):
+        """Count the lines of block (starting at offset) and record the checkpoints inside it."""
+        newlines = block.count(b'\n')
+        target = len(self.checkpoints) * self.stride
+        position = 0
+        line = self.lines
+
+        # Walk newline by newline only as far as the block's last checkpoint
+        while target <= self.lines + newlines:
+            while line < target:
+                position = block.index(b'\n', position) + 1
+                line += 1
+            self.checkpoints.append(offset + position)
+            target += self.stride
+
+        self.lines += newlines
+        self.scanned = offset + len(block)
+        self.partial = not block.endswith(b'\n')
+
+    def _reset(self, identity):
+        self.identity = identity
+        self.checkpoints = [0]
+        self.scanned = 0
+        self.size = None
+        self.lines = 0
+        self.partial = False
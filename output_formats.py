@@ -0,0 +1,256 @@
+import json
+import os
+from itertools import groupby, islice
+
+from csv_export import (
+    DEFAULT_FORMAT,
+    LAYOUT_RECORDS,
+    WRITE_CHUNK_RECORDS,
+    DeltaCSVWriter,
+    OutputStats,
+    compression_for,
+    iter_records,
+    iter_unique
+)
+
+
+# Output kinds, chosen by the file extension: CSV unless it names another kind.
+# Text kinds may add .gz or .xz for compression (e.g. out.csv.gz, out.jsonl.xz)
+KIND_CSV = 'csv'
+KIND_JSONL = 'jsonl'
+KIND_SQLITE = 'sqlite'
+TEXT_EXTENSIONS = {'.jsonl': KIND_JSONL, '.ndjson': KIND_JSONL}
+SQLITE_EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+
+# Table of the SQLite output; it has a text column per field name
+SQLITE_TABLE = 'records'
+
+
+def output_kind(path):
+    """Kind of output ('csv', 'jsonl' or 'sqlite') selected by path's extension."""
+    root, extension = os.path.splitext(path)
+    if extension.lower() in SQLITE_EXTENSIONS:
+        return KIND_SQLITE
+    if compression_for(path):
+        extension = os.path.splitext(root)[1]
+    return TEXT_EXTENSIONS.get(extension.lower(), KIND_CSV)
+
+
+def is_plain_csv(path):
+    """True if path is written as uncompressed CSV, the only kind that can be resumed or indexed."""
+    return output_kind(path) == KIND_CSV and not compression_for(path)
+
+
+def format_stats(stats):
+    """Describe an OutputStats for the status bar, e.g. '3.2 MB written, 4.1x compression'."""
+    text = f"{stats.disk_bytes / 2**20:.1f} MB written"
+    if stats.data_bytes is not None and stats.disk_bytes and stats.data_bytes != stats.disk_bytes:
+        text += f", {stats.data_bytes / stats.disk_bytes:.1f}x compression"
+    return text
+
+
+def write_jsonl(f, records, total=None, progress=None):
+    """Write records to the text file f as JSON Lines in chunks; return the number written.
+
+    Each line is one object mapping field names to values, in field order.
+    progress, if given, is called as progress(done, total) after each chunk.
+    """
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    done = 0
+    while True:
+        chunk = list(islice(records, WRITE_CHUNK_RECORDS))
+        if not chunk:
+            return done
+        f.write(''.join([encode(dict(zip(record.field_names, record.values))) + '\n' for record in chunk]))
+        done += len(chunk)
+        if progress:
+            progress(done, total)
+
+
+def _quote_name(name):
+    """Quote a field name as an SQL identifier."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class DeltaJSONLWriter(DeltaCSVWriter):
+    """Write session records as JSON Lines, appending only records added since the last save.
+
+    Saves append and rewrite exactly like the header-per-record CSV layout;
+    the export layout does not apply, since every line names its fields.
+    The file is always UTF-8.
+    """
+
+    def __init__(self):
+        super().__init__(DEFAULT_FORMAT)
+
+    def save(self, path, records, progress=None, layout=LAYOUT_RECORDS, dedupe=False):
+        """Persist records to path and return (mode, number of records written)."""
+        return super().save(path, records, progress, LAYOUT_RECORDS, dedupe)
+
+    def _write_records(self, f, records, layout, start, columns, new_file, seen, progress):
+        selected = iter_records(records, start)
+        if seen is not None:
+            selected = iter_unique(selected, seen)
+        return write_jsonl(f, selected, len(records) - start, progress)
+
+
+class SQLiteOutputWriter(DeltaCSVWriter):
+    """Write session records to a SQLite database, one row per record.
+
+    The records table has a text column per field name, added as new names
+    appear, and keeps the records in session order (by rowid).  A save
+    inserts the records added since the last one in a single transaction
+    while the database is as that save left it; otherwise the database is
+    built in a temporary file and renamed over the old one.  The export
+    layout does not apply.
+    """
+
+    def __init__(self):
+        super().__init__(DEFAULT_FORMAT)
+
+    def save(self, path, records, progress=None, layout=LAYOUT_RECORDS, dedupe=False):
+        """Persist records to path and return (mode, number of records written)."""
+        import sqlite3  # only needed for this output kind
+
+        path = os.path.abspath(path)
+        if self._can_append(path, records, LAYOUT_RECORDS, None):
+            start = self.saved_count
+            seen = self._seen_before(records, start) if dedupe else None
+            size = self.file_state[0]
+            written = 0
+            if start < len(records):
+                connection = sqlite3.connect(path)
+                try:
+                    with connection:
+                        written = self._insert(connection, records, start, seen, progress)
+                finally:
+                    connection.close()
+            mode = 'append'
+        else:
+            seen = set() if dedupe else None
+            size = 0
+            written = self._rebuild(path, records, seen, progress)
+            mode = 'rewrite'
+
+        self.path = path
+        self.saved_count = len(records)
+        self.file_state = self._stat(path)
+        self.layout = LAYOUT_RECORDS
+        self.columns = None
+        self.seen = seen
+        self.stats = OutputStats(None, self.file_state[0] - size)
+        return mode, written
+
+    def _rebuild(self, path, records, seen, progress):
+        """Write all records to a new database and rename it over path; return the records written."""
+        import sqlite3
+        import tempfile
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.csv_populator_', suffix='.tmp')
+        os.close(fd)
+        try:
+            # The file is not in place until it is complete, so it needs no journal
+            connection = sqlite3.connect(temp_path)
+            try:
+                connection.execute("PRAGMA journal_mode=OFF")
+                connection.execute("PRAGMA synchronous=OFF")
+                with connection:
+                    written = self._insert(connection, records, 0, seen, progress)
+            finally:
+                connection.close()
+            with open(temp_path, 'rb+') as f:
+                os.fsync(f.fileno())
+            os.chmod(temp_path, self._file_mode(path))
+            os.replace(temp_path, path)
+            return written
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _insert(self, connection, records, start, seen, progress=None):
+        """Insert records from start on, adding columns as needed; return the number inserted."""
+        # SQLite column names are case-insensitive
+        columns = {row[1].lower() for row in connection.execute(f"PRAGMA table_info({SQLITE_TABLE})")}
+        statements = {}
+        selected = iter_records(records, start)
+        if seen is not None:
+            selected = iter_unique(selected, seen)
+
+        total = len(records) - start
+        done = 0
+        while True:
+            chunk = list(islice(selected, WRITE_CHUNK_RECORDS))
+            if not chunk:
+                return done
+
+            # Runs of records with the same fields share one statement; runs keep the record order
+            for field_names, run in groupby(chunk, key=lambda record: record.field_names):
+                names = tuple(dict.fromkeys(field_names))
+                if len(names) == len(field_names):
+                    rows = [record.values for record in run]
+                else:
+                    # The last value wins for a repeated field name
+                    rows = [tuple(dict(zip(field_names, record.values)).values()) for record in run]
+
+                sql = statements.get(names)
+                if sql is None:
+                    sql = statements[names] = self._prepare(connection, columns, names)
+                connection.executemany(sql, rows)
+
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+
+    def _prepare(self, connection, columns, names):
+        """Create the table or add missing columns for names; return the INSERT statement."""
+        missing = [name for name in names if name.lower() not in columns]
+        if not columns:
+            definition = ', '.join(f"{_quote_name(name)} TEXT" for name in missing)
+            connection.execute(f"CREATE TABLE {SQLITE_TABLE} ({definition})")
+        else:
+            for name in missing:
+                connection.execute(f"ALTER TABLE {SQLITE_TABLE} ADD COLUMN {_quote_name(name)} TEXT")
+        columns.update(name.lower() for name in missing)
+
+        placeholders = ', '.join('?' * len(names))
+        return f"INSERT INTO {SQLITE_TABLE} ({', '.join(map(_quote_name, names))}) VALUES ({placeholders})"
+
+
+class OutputWriter:
+    """Send each save to the writer for the kind of output file it targets.
+
+    CSV (plain or compressed) goes to csv_writer; .jsonl and .sqlite files
+    get their own delta writers, unless csv_only is set (shared output files
+    must be CSV).  Like the writers, it exposes ``stats`` for the last save.
+    """
+
+    def __init__(self, csv_writer, csv_only=False):
+        self.writers = {KIND_CSV: csv_writer}
+        if not csv_only:
+            self.writers[KIND_JSONL] = DeltaJSONLWriter()
+            self.writers[KIND_SQLITE] = SQLiteOutputWriter()
+        self.stats = None
+
+    def save(self, path, records, progress=None, layout=LAYOUT_RECORDS, dedupe=False):
+        """Persist records with the writer for path and return (mode, number of records written)."""
+        kind = output_kind(path)
+        writer = self.writers.get(kind)
+        if writer is None:
+            raise ValueError(f"Shared output files must be CSV, not {kind}")
+        self.stats = None
+        result = writer.save(path, records, progress=progress, layout=layout, dedupe=dedupe)
+        self.stats = writer.stats
+        return result
+
+    def invalidate(self):
+        """Forget the persisted state of every writer."""
+        for writer in self.writers.values():
+            writer.invalidate()
+
+    def adopt(self, path, layout=LAYOUT_RECORDS, columns=None):
+        """Append later saves to an existing CSV file (see DeltaCSVWriter.adopt)."""
+        self.writers[KIND_CSV].adopt(path, layout, columns)
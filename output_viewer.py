@@ -0,0 +1,232 @@
+import os
+import tkinter as tk
+from contextlib import nullcontext
+from tkinter import ttk
+
+from line_index import SparseLineIndex, last_page, line_start, lines_back, map_file, next_line, read_lines
+from output_formats import is_plain_csv
+
+
+class OutputViewer:
+    """Paged, read-only view of an output CSV on disk, however large it is.
+
+    The view is positioned by byte offset, so scrolling, dragging the
+    scrollbar and jumping to the end never wait for the whole file.  Line
+    numbers and jump-to-line come from a SparseLineIndex built in the
+    background.  The file is memory-mapped only while a page is read, so
+    saves can still replace it.  While the view shows the end of the file
+    it follows new records as they are written.  Compressed, JSON Lines and
+    SQLite output is not shown, only named.
+    """
+
+    PAGE_LINES = 7
+    POLL_MS = 500
+
+    def __init__(self, parent, get_path):
+        self.get_path = get_path
+        self.path = None
+        self.viewable = False
+        self.index = None
+        self.top = 0
+        self.at_end = False
+        self.stamp = None
+        self._poll = None
+
+        self.frame = ttk.Frame(parent)
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+
+        self.text = tk.Text(self.frame, wrap=tk.NONE, height=self.PAGE_LINES, state=tk.DISABLED)
+        self.text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+
+        controls = ttk.Frame(self.frame)
+        controls.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+        ttk.Label(controls, text="Line:").pack(side=tk.LEFT)
+        self.line_entry = ttk.Entry(controls, width=10)
+        self.line_entry.pack(side=tk.LEFT, padx=(5, 5))
+        self.line_entry.bind('<Return>', lambda e: self._jump_to_entered_line())
+        ttk.Button(controls, text="Go", width=4, command=self._jump_to_entered_line).pack(side=tk.LEFT)
+        ttk.Button(controls, text="End", width=5, command=self.jump_to_end).pack(side=tk.LEFT, padx=(5, 10))
+        self.info_label = ttk.Label(controls, text="", foreground="gray")
+        self.info_label.pack(side=tk.LEFT)
+
+        for widget in (self.text, self.scrollbar):
+            widget.bind("<MouseWheel>", self._on_mousewheel)
+            widget.bind("<Button-4>", self._on_mousewheel)
+            widget.bind("<Button-5>", self._on_mousewheel)
+        self.text.bind("<Prior>", lambda e: self.scroll(-self.PAGE_LINES))
+        self.text.bind("<Next>", lambda e: self.scroll(self.PAGE_LINES))
+
+    def show(self):
+        """Open the current output path and start following it."""
+        self._check_file()
+        if self.viewable:
+            self.index.start()
+        self._render()
+        if self._poll is None:
+            self._poll = self.frame.after(self.POLL_MS, self._tick)
+
+    def hide(self):
+        """Stop polling and indexing while the view is not shown."""
+        if self._poll is not None:
+            self.frame.after_cancel(self._poll)
+            self._poll = None
+        if self.index:
+            self.index.stop()
+
+    def scroll(self, lines):
+        """Move the view by lines (negative is up)."""
+        with self._mapped() as data:
+            if data is None:
+                return "break"
+            if lines < 0:
+                self.top = lines_back(data, self.top, -lines)
+            else:
+                top = self.top
+                for _ in range(lines):
+                    following = next_line(data, top)
+                    if following >= len(data):
+                        break
+                    top = following
+                self.top = top
+        self._render()
+        return "break"
+
+    def jump_to_line(self, line):
+        """Show line (1-based) at the top, if the index has reached it."""
+        if not self.viewable:
+            return
+        with self._mapped() as data:
+            offset = self.index.offset_of(data, line - 1) if data is not None else None
+        if offset is None:
+            if self.index.complete:
+                self.info_label.config(text=f"The file has {self.index.line_count:,} lines")
+            else:
+                self.info_label.config(text=f"Line {line:,} is not indexed yet")
+            return
+        self.top = offset
+        self._render()
+
+    def jump_to_end(self):
+        """Show the last page of the file."""
+        with self._mapped() as data:
+            self.top = last_page(data, self.PAGE_LINES) if data is not None else 0
+        self._render()
+
+    def _jump_to_entered_line(self):
+        try:
+            line = int(self.line_entry.get().strip().replace(',', ''))
+        except ValueError:
+            self.info_label.config(text="Enter a line number")
+            return
+        self.jump_to_line(max(1, line))
+
+    def _mapped(self):
+        """Map the viewed file for a with block; None stands in for a missing, empty or binary file."""
+        if not self.viewable:
+            return nullcontext(None)
+        return map_file(self.path, missing_ok=True)
+
+    def _check_file(self):
+        """Follow a changed output path or file; return True if anything changed."""
+        path = self.get_path()
+        if path != self.path:
+            if self.index:
+                self.index.stop()
+            self.path = path
+            self.viewable = is_plain_csv(path)
+            self.index = SparseLineIndex(path)
+            self.top = 0
+            self.stamp = None
+
+        try:
+            st = os.stat(path)
+            stamp = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        except OSError:
+            stamp = None
+        if stamp == self.stamp:
+            return False
+
+        replaced = self.stamp is None or stamp is None or stamp[:2] != self.stamp[:2] or stamp[2] < self.stamp[2]
+        self.stamp = stamp
+        if replaced:
+            self.top = 0
+        if stamp is not None and self.viewable:
+            self.index.start()
+        return True
+
+    def _render(self):
+        """Draw the page starting at self.top."""
+        with self._mapped() as data:
+            if not self.viewable:
+                self._set_text("Only uncompressed .csv output files can be shown here.")
+                self.scrollbar.set(0.0, 1.0)
+                self.info_label.config(text=os.path.basename(self.path or ""))
+                self.at_end = True
+                return
+            if data is None:
+                self._set_text("Output file is empty or does not exist yet.")
+                self.scrollbar.set(0.0, 1.0)
+                self.info_label.config(text=os.path.basename(self.path or ""))
+                self.at_end = True
+                return
+
+            # The last page is as far down as the view goes
+            size = len(data)
+            self.top = min(line_start(data, min(self.top, size)), last_page(data, self.PAGE_LINES))
+            lines, bottom = read_lines(data, self.top, self.PAGE_LINES)
+            first_line = self.index.line_of(data, self.top)
+            self.at_end = bottom >= size
+
+        if first_line is not None:
+            width = len(str(first_line + len(lines)))
+            lines = [f"{first_line + i + 1:>{width}}  {line}" for i, line in enumerate(lines)]
+        self._set_text('\n'.join(lines))
+        self.scrollbar.set(self.top / size, bottom / size)
+
+        if self.index.complete:
+            total = f"{self.index.line_count:,} lines"
+        else:
+            total = f"indexing {self.index.scanned * 100 // max(size, 1)}%"
+        self.info_label.config(text=f"{os.path.basename(self.path)}: {size:,} bytes, {total}")
+
+    def _set_text(self, text):
+        self.text.config(state=tk.NORMAL)
+        self.text.delete('1.0', tk.END)
+        self.text.insert('1.0', text)
+        self.text.config(state=tk.DISABLED)
+
+    def _tick(self):
+        """Pick up file growth and indexing progress."""
+        self._poll = None
+        following = self.at_end
+        try:
+            if self._check_file() and following:
+                self.jump_to_end()
+            elif not self.index.complete or following:
+                self._render()
+        except OSError as e:
+            self.info_label.config(text=f"Cannot read output file: {str(e)}")
+        self._poll = self.frame.after(self.POLL_MS, self._tick)
+
+    def _on_scrollbar(self, action, *args):
+        """Map scrollbar drags to byte offsets and arrow/page clicks to lines."""
+        if action == 'moveto':
+            with self._mapped() as data:
+                if data is None:
+                    return
+                self.top = line_start(data, int(float(args[0]) * len(data)))
+            self._render()
+        elif action == 'scroll':
+            count, what = int(args[0]), args[1]
+            self.scroll(count * self.PAGE_LINES if what == 'pages' else count)
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            return self.scroll(-3)
+        if event.num == 5:
+            return self.scroll(3)
+        return self.scroll(-3 if event.delta > 0 else 3)
+
@@ -0,0 +1,41 @@
+import csv
+import io
+
+
+def iter_clipboard_rows(text):
+    """Yield the stripped cells of each non-blank row of tab-separated clipboard text.
+
+    Spreadsheets quote cells that hold tabs, quotes or line breaks; the
+    excel-tab dialect undoes that while reading the text a row at a time.
+    """
+    for row in csv.reader(io.StringIO(text), dialect='excel-tab'):
+        cells = [cell.strip() for cell in row]
+        if any(cells):
+            yield cells
+
+
+def map_columns(first_row, field_names, id_name=''):
+    """Decide which field each pasted column fills.
+
+    If every non-empty cell of the first row is a field name (or the ID
+    name), the row is a header and columns map by name; ID and unknown
+    columns are dropped.  Otherwise columns fill the fields in order.
+    Returns (columns, has_header), where columns[i] is a field name or None.
+    """
+    names = set(field_names)
+    cells = [cell for cell in first_row if cell]
+    if cells and all(cell in names or cell == id_name for cell in cells):
+        return [cell if cell in names else None for cell in first_row], True
+    return list(field_names), False
+
+
+def iter_pasted_fields(rows, columns, first_line=1):
+    """Yield the (field name, value) pairs of each pasted row.
+
+    Raises ValueError for a row with values in more columns than there are fields.
+    """
+    width = len(columns)
+    for line_number, row in enumerate(rows, first_line):
+        if len(row) > width and any(row[width:]):
+            raise ValueError(f"Row {line_number} has {len(row)} columns but there are {width} fields")
+        yield [(name, value) for name, value in zip(columns, row) if name]
@@ -0,0 +1,174 @@
+import tkinter as tk
+from collections import deque
+
+
+class PreviewPane:
+    """Bounded, incrementally rendered CSV preview on top of a Text widget.
+
+    Only a window of records is rendered at any time.  New records are appended
+    to the end of the window and the oldest lines are trimmed once more than
+    ``max_lines`` are shown, so adding a record costs the same regardless of
+    session size.  Scrolling to the top of the widget pages older records back
+    in on demand.  sync() appends every record added since the last render in
+    one insert, so callers can batch additions into a single redraw.
+    format_line renders one row of values as the export would write it.
+    """
+
+    EMPTY_MESSAGE = "No records yet. Complete a row and press 'New ID' to see preview."
+
+    def __init__(self, text_widget, scrollbar, record_count, record_slice, max_lines=1000, page_records=100, format_line=','.join):
+        self.text = text_widget
+        self.format_line = format_line
+        self.scrollbar = scrollbar
+        self.record_count = record_count
+        self.record_slice = record_slice
+        self.max_lines = max(2, max_lines)
+        self.page_records = max(1, min(page_records, self.max_lines // 4))
+
+        # Index of the first rendered record and line counts of rendered records
+        self.first_record = 0
+        self.rendered = deque()
+        self.rendered_lines = 0
+        self._paging_scheduled = False
+
+        # Record count when the window last reached the tail
+        self.synced_total = 0
+
+        self.text.configure(yscrollcommand=self._on_text_scroll)
+        self.scrollbar.configure(command=self.text.yview)
+
+    @property
+    def end_record(self):
+        """Index one past the last rendered record."""
+        return self.first_record + len(self.rendered)
+
+    def render_record(self, record):
+        """Render a record as preview text lines."""
+        # Quoted line breaks would throw off the line counts, so show them as a symbol
+        return [
+            self.format_line(record.field_names).replace('\r\n', '\u21b5').replace('\n', '\u21b5'),
+            self.format_line(record.values).replace('\r\n', '\u21b5').replace('\n', '\u21b5')
+        ]
+
+    def refresh(self):
+        """Re-render the newest window of records from scratch."""
+        self._clear()
+
+        total = self.synced_total = self.record_count()
+        if not total:
+            self._write(tk.END, self.EMPTY_MESSAGE)
+            return
+
+        # Walk backwards until the line budget is used up
+        blocks = []
+        start = total
+        while start > 0 and self.rendered_lines < self.max_lines:
+            chunk = self.record_slice(max(0, start - self.page_records), start)
+            for record in reversed(chunk):
+                if self.rendered_lines >= self.max_lines:
+                    break
+                lines = self.render_record(record)
+                blocks.append('\n'.join(lines) + '\n')
+                self.rendered.appendleft(len(lines))
+                self.rendered_lines += len(lines)
+                start -= 1
+
+        self.first_record = start
+        blocks.reverse()
+        self._write(tk.END, ''.join(blocks))
+        self.text.see(tk.END)
+
+    def sync(self):
+        """Append the records added since the last render, in one insert."""
+        total = self.record_count()
+        start = self.end_record
+        if start != self.synced_total or total < start or total - start > self.max_lines:
+            # Paged back, cleared, or more new records than the window holds
+            self.refresh()
+            return
+        if start == total:
+            return
+
+        if not self.rendered:
+            self._clear()
+
+        blocks = []
+        for record in self.record_slice(start, total):
+            lines = self.render_record(record)
+            blocks.append('\n'.join(lines) + '\n')
+            self.rendered.append(len(lines))
+            self.rendered_lines += len(lines)
+        self.synced_total = total
+        self._write(tk.END, ''.join(blocks))
+        self._trim_top()
+        self.text.see(tk.END)
+
+    def _on_text_scroll(self, first, last):
+        """Forward scroll position to the scrollbar and page in older records at the top."""
+        self.scrollbar.set(first, last)
+        if float(first) <= 0.0 and self.first_record > 0 and not self._paging_scheduled:
+            self._paging_scheduled = True
+            self.text.after_idle(self._page_older)
+
+    def _page_older(self):
+        """Prepend a page of older records, trimming the newest ones to stay bounded."""
+        self._paging_scheduled = False
+        if self.first_record <= 0:
+            return
+
+        start = max(0, self.first_record - self.page_records)
+        chunk = self.record_slice(start, self.first_record)
+
+        added_lines = 0
+        for record in reversed(chunk):
+            count = len(self.render_record(record))
+            self.rendered.appendleft(count)
+            added_lines += count
+        self.rendered_lines += added_lines
+        self.first_record = start
+
+        self._write('1.0', self._join(chunk))
+        self._trim_bottom()
+        self.text.see(f"{added_lines + 1}.0")
+
+    def _trim_top(self):
+        """Drop the oldest rendered records while over the line budget."""
+        drop_lines = 0
+        while self.rendered_lines - drop_lines > self.max_lines and len(self.rendered) > 1:
+            drop_lines += self.rendered.popleft()
+            self.first_record += 1
+        if drop_lines:
+            self.rendered_lines -= drop_lines
+            self._delete('1.0', f"{drop_lines + 1}.0")
+
+    def _trim_bottom(self):
+        """Drop the newest rendered records while over the line budget."""
+        drop_lines = 0
+        while self.rendered_lines - drop_lines > self.max_lines and len(self.rendered) > 1:
+            drop_lines += self.rendered.pop()
+        if drop_lines:
+            self.rendered_lines -= drop_lines
+            self._delete(f"{self.rendered_lines + 1}.0", tk.END)
+
+    def _join(self, records):
+        """Render several records into one text block."""
+        return ''.join('\n'.join(self.render_record(record)) + '\n' for record in records)
+
+    def _clear(self):
+        """Remove all rendered text and reset the window."""
+        self._delete('1.0', tk.END)
+        self.rendered.clear()
+        self.rendered_lines = 0
+        self.first_record = 0
+
+    def _write(self, index, text):
+        """Insert text into the read-only widget."""
+        self.text.config(state=tk.NORMAL)
+        self.text.insert(index, text)
+        self.text.config(state=tk.DISABLED)
+
+    def _delete(self, start, end):
+        """Delete a text range from the read-only widget."""
+        self.text.config(state=tk.NORMAL)
+        self.text.delete(start, end)
+        self.text.config(state=tk.DISABLED)
@@ -0,0 +1,172 @@
+from array import array
+from collections import namedtuple
+from itertools import groupby, islice
+
+
+Record = namedtuple('Record', ['field_names', 'values'])
+
+
+def build_record(id_name, current_id, fields, keep_empty=False):
+    """Build (field_names, values) for a record from the ID and (name, value) pairs.
+
+    Fields without a name, or without a value unless keep_empty is set, are
+    skipped.  Returns None when the record would hold nothing besides the ID.
+    """
+    field_names = []
+    values = []
+
+    if id_name and current_id is not None:
+        field_names.append(id_name)
+        values.append(str(current_id))
+
+    for field_name, value in fields:
+        if field_name and (value or keep_empty):
+            field_names.append(field_name)
+            values.append(value)
+
+    if len(field_names) > 1:
+        return field_names, values
+    return None
+
+
+class RecordStore:
+    """Compact, append-only store of session records.
+
+    Every distinct tuple of field names (a schema) is stored once and referred
+    to by its id.  Values live in per-schema column lists, and two integer
+    arrays map each record, in insertion order, to its schema and row.
+    """
+
+    def __init__(self):
+        self._schemas = []
+        self._schema_ids = {}
+        self._columns = []
+        self._row_counts = []
+        self._record_schema = array('I')
+        self._record_row = array('I')
+
+    def __len__(self):
+        return len(self._record_schema)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._record(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        return self._record(index)
+
+    def append(self, field_names, values):
+        """Add a record and return its index."""
+        field_names = tuple(field_names)
+        if len(field_names) != len(values):
+            raise ValueError("field_names and values must have the same length")
+
+        schema_id = self._intern_schema(field_names)
+        for column, value in zip(self._columns[schema_id], values):
+            column.append(value)
+
+        self._record_schema.append(schema_id)
+        self._record_row.append(self._row_counts[schema_id])
+        self._row_counts[schema_id] += 1
+        return len(self._record_schema) - 1
+
+    def extend(self, records):
+        """Add (field_names, values) pairs and return how many were added."""
+        count = 0
+        for field_names, values in records:
+            self.append(field_names, values)
+            count += 1
+        return count
+
+    def clear(self):
+        """Remove all records and schemas."""
+        self.__init__()
+
+    def snapshot(self):
+        """Return a read-only view of the records stored so far.
+
+        The view shares storage with the store, so taking it is cheap.  Later
+        appends are not visible through it, and clear() leaves it intact, which
+        makes it safe to hand to another thread.
+        """
+        return RecordSnapshot(self)
+
+    def schemas(self):
+        """Return (schema_id, field_names) for each distinct schema, in first-seen order."""
+        return list(enumerate(self._schemas))
+
+    def runs(self, start=0, stop=None):
+        """Yield (field_names, value tuples) for each run of consecutive records sharing a schema.
+
+        A run's records are consecutive rows of the schema's columns, so its
+        values are sliced from the columns without rebuilding each record.
+        """
+        stop = len(self) if stop is None else stop
+        index = start
+        for schema_id, group in groupby(self._record_schema[start:stop]):
+            count = len(list(group))
+            first = self._record_row[index]
+            columns = self._columns[schema_id]
+            if columns:
+                yield self._schemas[schema_id], list(zip(*[column[first:first + count] for column in columns]))
+            else:
+                yield self._schemas[schema_id], [()] * count
+            index += count
+
+    def rows(self, schema_id):
+        """Iterate over the value tuples of all records with the given schema."""
+        if not self._columns[schema_id]:
+            return iter(())
+        return islice(zip(*self._columns[schema_id]), self._row_counts[schema_id])
+
+    def _intern_schema(self, field_names):
+        """Return the id for field_names, registering it if unseen."""
+        schema_id = self._schema_ids.get(field_names)
+        if schema_id is None:
+            schema_id = len(self._schemas)
+            self._schema_ids[field_names] = schema_id
+            self._schemas.append(field_names)
+            self._columns.append([[] for _ in field_names])
+            self._row_counts.append(0)
+        return schema_id
+
+    def _record(self, index):
+        """Rebuild the record at index from its schema columns."""
+        schema_id = self._record_schema[index]
+        row = self._record_row[index]
+        values = [column[row] for column in self._columns[schema_id]]
+        return Record(self._schemas[schema_id], values)
+
+
+class RecordSnapshot(RecordStore):
+    """Frozen view of a RecordStore at the moment it was taken."""
+
+    def __init__(self, store):
+        self._schemas = store._schemas[:]
+        self._schema_ids = store._schema_ids
+        self._columns = store._columns
+        self._row_counts = store._row_counts[:]
+        self._record_schema = store._record_schema
+        self._record_row = store._record_row
+        self._length = len(store)
+
+    def __len__(self):
+        return self._length
+
+    def append(self, field_names, values):
+        raise TypeError("record snapshots are read-only")
+
+    def extend(self, records):
+        raise TypeError("record snapshots are read-only")
+
+    def clear(self):
+        raise TypeError("record snapshots are read-only")
+
+    def snapshot(self):
+        return self
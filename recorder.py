@@ -0,0 +1,170 @@
+import functools
+import json
+import time
+
+
+# First line of a recording; the rest are one compact JSON array per event:
+#     [milliseconds since start, kind, widget role, data]
+# kind is 'key' for a keystroke that changed an entry (data is [keysym, text])
+# or the name of the app handler that ran (data holds its arguments)
+RECORDING_FORMAT = 'csv-populator-recording'
+RECORDING_VERSION = 1
+
+# App handlers recorded, and replayed, by name
+RECORDED_HANDLERS = (
+    '_handle_tab',
+    '_new_id',
+    '_paste_records',
+    '_save_to_csv',
+    '_apply_template',
+    '_delete_field_pair',
+    '_clear_all_fields'
+)
+
+# Entries outside the field grid, by the role recorded for them
+ENTRY_ROLES = {
+    'id_name': 'starting_id_name_entry',
+    'id_number': 'starting_id_number_entry',
+    'filename': 'filename_entry'
+}
+
+# Keys that never change an entry's text
+IGNORED_KEYS = {'Tab', 'ISO_Left_Tab', 'Return', 'Shift_L', 'Shift_R', 'Control_L', 'Control_R', 'Alt_L', 'Alt_R'}
+
+# Events written between flushes of the recording file
+FLUSH_EVENTS = 50
+
+
+def cell_role(index, role):
+    """Role recorded for a field grid cell, e.g. 'value:3'."""
+    return f"{role}:{index}"
+
+
+def parse_role(role):
+    """Split a recorded role into (index, grid role) for a grid cell, or (None, role)."""
+    name, _, index = role.partition(':')
+    return (int(index), name) if index else (None, role)
+
+
+def read_recording(path):
+    """Return (header, events) of a recording file.
+
+    Raises ValueError if the file is not a recording.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline() or 'null')
+        if not isinstance(header, dict) or header.get('format') != RECORDING_FORMAT:
+            raise ValueError(f"{path} is not a CSV Populator recording")
+        if header.get('version') != RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version: {header.get('version')}")
+        return header, [json.loads(line) for line in f if line.strip()]
+
+
+class InputRecorder:
+    """Opt-in log of the input events a CSVPopulatorApp handles, for replay.
+
+    instrument() wraps the app's handlers by name, like diagnostics do, so it
+    must run before the UI binds them; start() then writes the form's state
+    and begins logging.  Keystrokes are logged only when they change an
+    entry's text, together with the text itself, so replay does not depend
+    on cursor positions or keyboard layouts.  Entry contents are written as
+    typed: only record sessions whose data may be kept in a file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.app = None
+        self.file = None
+        self.started = None
+        self.entry_roles = {}
+        self.texts = {}
+        self.depth = 0
+        self.unflushed = 0
+
+    def instrument(self, app):
+        """Replace the app's recorded handlers with logging wrappers."""
+        for name in RECORDED_HANDLERS:
+            setattr(app, name, self.wrap(name, getattr(app, name)))
+
+    def wrap(self, name, func):
+        """Return func wrapped to log its outermost calls under name."""
+
+        @functools.wraps(func)
+        def logged(*args, **kwargs):
+            if self.depth == 0 and self.file:
+                role, data = self._describe(name, args, kwargs)
+                self._write(name, role, data)
+                # Handlers change entries; the next keystroke in any of them is logged
+                self.texts.clear()
+            self.depth += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.depth -= 1
+
+        return logged
+
+    def start(self, app):
+        """Write the header with the form's current state and start logging."""
+        self.app = app
+        self.entry_roles = {str(getattr(app, attribute)): role for role, attribute in ENTRY_ROLES.items()}
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.started = time.perf_counter()
+        header = {
+            'format': RECORDING_FORMAT,
+            'version': RECORDING_VERSION,
+            'recorded': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'entries': {role: getattr(app, attribute).get() for role, attribute in ENTRY_ROLES.items()},
+            'fields': [list(pair) for pair in app.fields.pairs()],
+            'layout': app.layout_combo.get()
+        }
+        self.file.write(json.dumps(header, ensure_ascii=False) + '\n')
+        app.root.bind_all('<KeyRelease>', self._on_key_release, add='+')
+
+    def close(self):
+        """Stop logging and close the recording file."""
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def role_of(self, widget):
+        """Role of an entry widget: a grid cell or one of ENTRY_ROLES, else None."""
+        cell = self.app.field_grid.cell_of(widget)
+        if cell:
+            return cell_role(*cell)
+        return self.entry_roles.get(str(widget))
+
+    def _on_key_release(self, event):
+        if not self.file or event.keysym in IGNORED_KEYS:
+            return
+        role = self.role_of(event.widget)
+        if role is None:
+            return
+        text = event.widget.get()
+        if self.texts.get(role) != text:
+            self.texts[role] = text
+            self._write('key', role, [event.keysym, text])
+
+    def _describe(self, name, args, kwargs):
+        """Return the (role, data) logged for a handler call."""
+        if name == '_handle_tab':
+            return self.role_of(args[0].widget), None
+        if name == '_delete_field_pair':
+            return None, args[0]
+        if name == '_apply_template':
+            clear_records = kwargs.get('clear_records', args[1] if len(args) > 1 else False)
+            return None, [args[0], bool(clear_records)]
+        if name == '_paste_records':
+            try:
+                return None, self.app.root.clipboard_get()
+            except Exception:
+                return None, None
+        return None, None
+
+    def _write(self, kind, role, data):
+        elapsed_ms = round((time.perf_counter() - self.started) * 1000)
+        self.file.write(json.dumps([elapsed_ms, kind, role, data], ensure_ascii=False, separators=(',', ':')) + '\n')
+        self.unflushed += 1
+        if self.unflushed >= FLUSH_EVENTS:
+            self.file.flush()
+            self.unflushed = 0
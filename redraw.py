@@ -0,0 +1,43 @@
+class RedrawScheduler:
+    """Coalesces redraws of parts of the view into one idle callback.
+
+    Each part of the view registers a redraw function under a name.  Callers
+    mark parts dirty instead of redrawing them; the first mark schedules a
+    single after_idle callback that redraws every dirty part once, in the
+    order the parts were registered.  Bursts of keystrokes or bulk edits
+    therefore cost one redraw per part per idle cycle.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.parts = {}
+        self.dirty = set()
+        self._pending = None
+
+    def register(self, part, redraw):
+        """Register the function that redraws part."""
+        self.parts[part] = redraw
+
+    def mark(self, *parts):
+        """Mark parts dirty and make sure a redraw is scheduled."""
+        self.dirty.update(parts)
+        if self._pending is None and self.dirty:
+            self._pending = self.widget.after_idle(self._run)
+
+    def flush(self, *parts):
+        """Redraw the given dirty parts now, or every dirty part if none are given.
+
+        For callers that need the view current before they continue, e.g. to
+        scroll to a row that was just added.
+        """
+        for part in self.parts:
+            if part in self.dirty and (not parts or part in parts):
+                self.dirty.discard(part)
+                self.parts[part]()
+        if not self.dirty and self._pending is not None:
+            self.widget.after_cancel(self._pending)
+            self._pending = None
+
+    def _run(self):
+        self._pending = None
+        self.flush()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded input session against this build and report per-event latency.
+
+Record a real session, then replay it (under Xvfb when no display is available):
+
+    python csv_populator.py --record shift.rec
+    python replay.py shift.rec --output replay.json
+    python replay.py shift.rec --speed recorded --baseline replay.json   # exit 1 on regressions
+
+The replay starts a fresh CSVPopulatorApp with the form as it was when the
+recording started, then calls the recorded handlers with the recorded entry
+contents, at maximum speed or with the recorded pauses.  Each event is timed
+from its dispatch until the main loop has run its pending work, so coalesced
+redraws count against the event that caused them.  Output files are written
+to a temporary directory instead of the recorded path.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from benchmark import DEFAULT_THRESHOLD, compare, start_virtual_display, summarize
+from field_grid import VALUE
+from recorder import ENTRY_ROLES, RECORDED_HANDLERS, parse_role, read_recording
+
+
+SPEEDS = ("max", "recorded")
+SLOWEST_EVENTS = 10
+IDLE_SLEEP_SECONDS = 0.001
+
+
+class Replayer:
+    """Drives a fresh application through the events of a recording."""
+
+    def __init__(self, header, workdir):
+        import tkinter as tk
+        from csv_populator import CSVPopulatorApp
+
+        self.tk = tk
+        self.workdir = workdir
+        self.root = tk.Tk()
+        # Default paths (e.g. the output file Clear All restores) point into the work directory
+        app_class = type("ReplayApp", (CSVPopulatorApp,), {"_get_desktop_path": lambda app: workdir})
+        self.app = app_class(self.root)
+        self.app._finish_startup()
+        self.restore(header)
+        self.root.update()
+
+    def restore(self, header):
+        """Put the form into the state recorded in the header."""
+        app = self.app
+        for role, text in header.get("entries", {}).items():
+            self.set_text(self.entry(role), self.redirect(role, text))
+
+        fields = header.get("fields") or [["", ""]]
+        app.fields.reset(name for name, value in fields)
+        for index, (name, value) in enumerate(fields):
+            app.fields.set(index, VALUE, value)
+        app.field_grid.refresh()
+        app._revalidate_all()
+
+        if header.get("layout") in app.EXPORT_LAYOUTS:
+            app.layout_combo.set(header["layout"])
+        app.redraw.mark("id_label")
+
+    def run(self, events, speed="max"):
+        """Replay events; return (timings, skipped, errors).
+
+        timings holds (event number, kind, seconds) for every replayed event.
+        """
+        timings = []
+        skipped = 0
+        errors = []
+        start = time.perf_counter()
+        for number, (elapsed_ms, kind, role, data) in enumerate(events):
+            if speed == "recorded":
+                due = start + elapsed_ms / 1000
+                while time.perf_counter() < due:
+                    self.root.update()
+                    time.sleep(IDLE_SLEEP_SECONDS)
+
+            began = time.perf_counter()
+            try:
+                try:
+                    replayed = self.dispatch(kind, role, data)
+                finally:
+                    self.contain_output()
+                self.root.update()
+            except Exception as e:
+                errors.append({"event": number, "kind": kind, "error": f"{type(e).__name__}: {e}"})
+                continue
+            if replayed:
+                timings.append((number, kind, time.perf_counter() - began))
+            else:
+                skipped += 1
+        return timings, skipped, errors
+
+    def dispatch(self, kind, role, data):
+        """Feed one recorded event to the app; return False if it cannot be replayed here."""
+        app = self.app
+        if kind == "key":
+            entry = self.entry(role)
+            if entry is None:
+                return False
+            keysym, text = data
+            self.set_text(entry, self.redirect(role, text))
+            if role in ("id_name", "id_number"):
+                # What the entries' KeyRelease bindings do
+                app.redraw.mark("id_label")
+        elif kind == "_handle_tab":
+            entry = self.entry(role) if role else None
+            if entry is None:
+                return False
+            app._handle_tab(SimpleNamespace(widget=entry))
+        elif kind == "_apply_template":
+            path, clear_records = data
+            if not os.path.exists(path):
+                return False
+            app._apply_template(path, clear_records=clear_records)
+        elif kind == "_delete_field_pair":
+            app._delete_field_pair(data)
+        elif kind == "_paste_records":
+            if data is None:
+                return False
+            self.root.clipboard_clear()
+            self.root.clipboard_append(data)
+            app._paste_records()
+        elif kind in RECORDED_HANDLERS:
+            getattr(app, kind)()
+        else:
+            return False
+        return True
+
+    def entry(self, role):
+        """Return the entry widget for a recorded role, focusing grid cells as typing would."""
+        index, name = parse_role(role)
+        if index is None:
+            attribute = ENTRY_ROLES.get(name)
+            return getattr(self.app, attribute) if attribute else None
+        if index >= len(self.app.fields):
+            return None
+        self.app.field_grid.focus_cell(index, name)
+        return self.app.field_grid.entry_for(index, name)
+
+    def redirect(self, role, text):
+        """Keep output files inside the work directory."""
+        if role == "filename":
+            return os.path.join(self.workdir, os.path.basename(text) or "output.csv")
+        return text
+
+    def contain_output(self):
+        """Point the output file back into the work directory if a handler moved it out."""
+        entry = self.app.filename_entry
+        path = os.path.abspath(self.app._get_output_path())
+        if os.path.dirname(path) != os.path.abspath(self.workdir):
+            self.set_text(entry, self.redirect("filename", entry.get().strip()))
+
+    def set_text(self, entry, text):
+        entry.delete(0, self.tk.END)
+        entry.insert(0, text)
+
+    def close(self):
+        """Let saves finish and close the application."""
+        self.app._on_close()
+
+
+def build_report(path, header, events, timings, skipped, errors, speed):
+    """Summarize replay timings per event kind, with the slowest events."""
+    by_kind = {}
+    for number, kind, seconds in timings:
+        by_kind.setdefault(kind, []).append(seconds)
+    results = {kind: summarize(samples) for kind, samples in sorted(by_kind.items())}
+    if timings:
+        results["all"] = summarize([seconds for number, kind, seconds in timings])
+
+    slowest = sorted(timings, key=lambda timing: timing[2], reverse=True)[:SLOWEST_EVENTS]
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "recording": os.path.abspath(path),
+            "recorded": header.get("recorded"),
+            "speed": speed,
+            "events": len(events),
+            "replayed": len(timings),
+            "skipped": skipped
+        },
+        "results": {"replay": results},
+        "slowest": [
+            {"event": number, "kind": kind, "ms": seconds * 1000, "at_ms": events[number][0]}
+            for number, kind, seconds in slowest
+        ],
+        "errors": errors
+    }
+
+
+def main(argv=None):
+    """Entry point: replay a recording, print JSON, compare with a baseline."""
+    parser = argparse.ArgumentParser(description="Replay a CSV Populator input recording and time each event.")
+    parser.add_argument("recording", help="File written by csv_populator.py --record")
+    parser.add_argument("--speed", choices=SPEEDS, default="max", help="Replay as fast as possible or with the recorded pauses")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Compare against a previous replay report of the same recording")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed p50 slowdown ratio")
+    args = parser.parse_args(argv)
+
+    try:
+        header, events = read_recording(args.recording)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    display = start_virtual_display()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            replayer = Replayer(header, workdir)
+            try:
+                timings, skipped, errors = replayer.run(events, args.speed)
+            finally:
+                replayer.close()
+    finally:
+        if display:
+            display.terminate()
+
+    report = build_report(args.recording, header, events, timings, skipped, errors, args.speed)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        report["regressions"] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
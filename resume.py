@@ -0,0 +1,165 @@
+import io
+import mmap
+from collections import namedtuple
+
+from csv_export import DEFAULT_FORMAT, LAYOUT_GROUPED, LAYOUT_RECORDS, LAYOUT_UNIFIED
+from ids import IDFormat
+
+
+# How far back from the end a header is searched for before giving up
+MAX_SCAN_BYTES = 1 << 20
+
+
+ResumePoint = namedtuple('ResumePoint', ['id_name', 'last_id', 'field_names', 'layout', 'columns'])
+
+
+def read_resume_point(path, max_scan_bytes=MAX_SCAN_BYTES, csv_format=DEFAULT_FORMAT):
+    """Find the last record of an output CSV by scanning backwards from its end.
+
+    The file is memory-mapped and only its first line and tail are read, so
+    the cost does not grow with the file size.  The first line is always a
+    header, and every header starts with the same ID name, so later headers
+    are found with a byte search for that name rather than by parsing each
+    line.  Returns a ResumePoint, or None if the file holds no records.
+    """
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+
+    with data:
+        first_end = _line_end(data, 0)
+        first_line = _parse_line(data[:first_end].rstrip(b'\r\n'), csv_format)
+        floor = max(0, len(data) - max_scan_bytes)
+        encoding = 'utf-8' if csv_format.encoding.startswith('utf-8') else csv_format.encoding
+        quote = csv_format.quotechar.encode(encoding) if csv_format.quotechar else None
+        last = _last_record(data, floor, quote)
+        if not first_line or last is None or last[0] == 0:
+            return None
+        last_start, line = last
+        values = _parse_line(line, csv_format)
+        if not values or IDFormat.parse(values[0]) is None:
+            return None
+        last_id = values[0]
+        id_name = first_line[0]
+        if _same_id_format(id_name, last_id):
+            return None
+
+        # A header line starts with the ID name and a delimiter, right after a line break
+        marker = b'\n' + csv_format.format_line([id_name, '']).encode(encoding)
+
+        header_start = _find_header(data, marker, floor, last_start, last_id, csv_format)
+        if header_start is None:
+            # Further back than the scan window: the single-table header
+            header_start = 0
+        header_end = _line_end(data, header_start)
+        header = first_line if header_start == 0 else _parse_line(data[header_start:header_end].rstrip(b'\r\n'), csv_format)
+        above = data[header_end:last_start].strip()
+
+        if above:
+            layout = LAYOUT_UNIFIED if header_start == 0 else LAYOUT_GROUPED
+        elif header_start == 0:
+            layout = LAYOUT_RECORDS
+        else:
+            # One row under the header: grouped if the group before it has more than one
+            previous = _find_header(data, marker, floor, header_start, last_id, csv_format)
+            if previous is None and floor > 0:
+                layout = LAYOUT_GROUPED
+            else:
+                previous_rows = _count_rows(data[_line_end(data, previous or 0):header_start], quote, csv_format)
+                layout = LAYOUT_GROUPED if previous_rows > 1 else LAYOUT_RECORDS
+
+    if len(header) != len(values):
+        return None
+
+    return ResumePoint(header[0], last_id, header[1:], layout, header)
+
+
+def _last_record(data, floor, quote):
+    """Return (offset, bytes) of the last non-blank record at or after floor, or None.
+
+    A record whose values hold line breaks spans several lines: while the
+    record so far has an odd number of quote characters, it is extended by
+    the line above.  Doubled quotes inside a value do not change the parity.
+    """
+    lines = _iter_lines_reversed(data, floor)
+    last = next(lines, None)
+    if last is None or not quote:
+        return last
+    start, record = last
+    end = start + len(record)
+    while record.count(quote) % 2:
+        above = next(lines, None)
+        if above is None:
+            # The record starts before the scan window
+            return None
+        start = above[0]
+        record = data[start:end]
+    return start, record
+
+
+def _count_rows(chunk, quote, csv_format=DEFAULT_FORMAT):
+    """Number of non-blank CSV rows in chunk, parsing it only if a value may hold a line break."""
+    if not quote or quote not in chunk:
+        return sum(1 for line in chunk.split(b'\n') if line.strip())
+    encoding = 'utf-8' if csv_format.encoding.startswith('utf-8') else csv_format.encoding
+    return sum(1 for row in csv_format.reader(io.StringIO(chunk.decode(encoding), newline='')) if row)
+
+
+def _find_header(data, marker, floor, end, last_id, csv_format=DEFAULT_FORMAT):
+    """Return the offset of the last header line starting between floor and end, or None.
+
+    Candidates are found by searching for marker (a line break, the ID name
+    and a delimiter); one counts as a header if its first cell is not an ID
+    like last_id.  The header on the first line is not found.
+    """
+    while end > floor:
+        found = data.rfind(marker, floor, end)
+        if found < 0:
+            return None
+        start = found + 1
+        cells = _parse_line(data[start:_line_end(data, start)].rstrip(b'\r\n'), csv_format)
+        if cells and not _same_id_format(cells[0], last_id):
+            return start
+        end = found + len(marker) - 1
+    return None
+
+
+def _line_end(data, start):
+    """Offset just past the line break of the line starting at start (or the end of data)."""
+    end = data.find(b'\n', start)
+    return len(data) if end < 0 else end + 1
+
+
+def _iter_lines_reversed(data, floor=0):
+    """Yield (offset, bytes) for each non-blank line of data, last line first, down to floor."""
+    end = len(data)
+    while end > floor:
+        start = data.rfind(b'\n', floor, end - 1) + 1
+        if start == 0 and floor > 0:
+            # The line starting before floor is cut off; stop rather than misread it
+            return
+        line = data[start:end].rstrip(b'\r\n')
+        if line.strip():
+            yield start, line
+        end = start
+
+
+def _parse_line(line, csv_format=DEFAULT_FORMAT):
+    """Split one CSV line into cells."""
+    if isinstance(line, bytes):
+        encoding = 'utf-8-sig' if csv_format.encoding.startswith('utf-8') else csv_format.encoding
+        line = line.decode(encoding)
+    return next(csv_format.reader([line]), [])
+
+
+def _same_id_format(cell, last_id):
+    """True if cell looks like an ID written in the same format as last_id."""
+    cell_format = IDFormat.parse(cell)
+    last_format = IDFormat.parse(last_id)
+    return (
+        cell_format is not None
+        and cell_format.prefix == last_format.prefix
+        and cell_format.suffix == last_format.suffix
+    )
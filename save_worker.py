@@ -0,0 +1,112 @@
+import queue
+import threading
+from collections import deque
+
+from csv_export import LAYOUT_RECORDS
+
+
+class SaveWorker:
+    """Run CSV saves on a background thread so the Tk main loop never blocks on I/O.
+
+    Jobs run one at a time in submission order.  A save submitted while another
+    save is still queued replaces it, so bursts of Save presses or autosaves
+    collapse into a single write of the newest snapshot.  Results are posted to
+    ``events`` for the main thread to poll:
+
+        ('progress', done, total)
+        ('saved', path, mode, written, total, stats)
+        ('error', path, exception)
+        ('reset',)
+
+    stats is the writer's OutputStats for the save (bytes written and the
+    size before compression).  'reset' is posted once an invalidate() has
+    run, so results of saves queued before it can be told from later ones.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.events = queue.Queue()
+        self._jobs = deque()
+        self._condition = threading.Condition()
+        self._running = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="csv-save-worker", daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self):
+        """True while a job is running or waiting."""
+        with self._condition:
+            return self._running or bool(self._jobs)
+
+    def submit(self, path, records, layout=LAYOUT_RECORDS, dedupe=False):
+        """Queue a save of a record snapshot; return True if it replaced a queued save."""
+        with self._condition:
+            job = ('save', path, records, layout, dedupe)
+            coalesced = bool(self._jobs) and self._jobs[-1][0] == 'save'
+            if coalesced:
+                self._jobs[-1] = job
+            else:
+                self._jobs.append(job)
+            self._condition.notify()
+        return coalesced
+
+    def invalidate(self):
+        """Reset the writer's persisted state once the jobs queued before it have run."""
+        with self._condition:
+            self._jobs.append(('reset',))
+            self._condition.notify()
+
+    def adopt(self, path, layout=LAYOUT_RECORDS, columns=None):
+        """Make the writer append to an existing file once the jobs queued before it have run."""
+        with self._condition:
+            self._jobs.append(('adopt', path, layout, columns))
+            self._condition.notify()
+
+    def close(self, timeout=None):
+        """Finish queued jobs and stop the thread; return False if it is still running."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _run(self):
+        """Worker loop: take jobs in order until closed and drained."""
+        while True:
+            with self._condition:
+                while not self._jobs and not self._closed:
+                    self._condition.wait()
+                if not self._jobs:
+                    return
+                job = self._jobs.popleft()
+                self._running = True
+
+            try:
+                if job[0] == 'reset':
+                    try:
+                        self.writer.invalidate()
+                    finally:
+                        self.events.put(('reset',))
+                elif job[0] == 'adopt':
+                    self.writer.adopt(*job[1:])
+                else:
+                    self._save(*job[1:])
+            finally:
+                with self._condition:
+                    self._running = False
+
+    def _save(self, path, records, layout, dedupe):
+        """Write one snapshot and report the outcome."""
+        try:
+            mode, written = self.writer.save(
+                path,
+                records,
+                progress=lambda done, total: self.events.put(('progress', done, total)),
+                layout=layout,
+                dedupe=dedupe
+            )
+        except Exception as e:
+            self.events.put(('error', path, e))
+        else:
+            self.events.put(('saved', path, mode, written, len(records), self.writer.stats))
@@ -0,0 +1,273 @@
+import json
+import sqlite3
+from itertools import groupby
+
+from record_store import Record
+
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS schemas (
+    id INTEGER PRIMARY KEY,
+    field_names TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS records (
+    session INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    schema_id INTEGER NOT NULL,
+    record_values TEXT NOT NULL,
+    PRIMARY KEY (session, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS records_by_schema ON records (session, schema_id, seq);
+"""
+
+
+def _connect(path):
+    """Open a connection tuned for many small appends."""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class _SQLiteRecords:
+    """Read access shared by the live store and its snapshots."""
+
+    # Rows fetched per cursor round trip when iterating
+    FETCH_ROWS = 1000
+
+    def __len__(self):
+        return self._length()
+
+    def __iter__(self):
+        yield from self._iter_range(0, len(self))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            records = list(self._iter_range(start, stop)) if start < stop else []
+            return records[::step] if step != 1 else records
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        return next(self._iter_range(index, index + 1))
+
+    def schemas(self):
+        """Return (schema_id, field_names) for the schemas used in this session, in first-seen order."""
+        stored = self._stored_count()
+        cursor = self._conn().execute(
+            "SELECT schema_id FROM records WHERE session = ? AND seq < ? GROUP BY schema_id ORDER BY MIN(seq)",
+            (self.session, stored)
+        )
+        schema_ids = [schema_id for (schema_id,) in cursor]
+        for schema_id, values in self._pending_slice(0, len(self) - stored):
+            if schema_id not in schema_ids:
+                schema_ids.append(schema_id)
+        return [(schema_id, self._schemas[schema_id]) for schema_id in schema_ids]
+
+    def rows(self, schema_id):
+        """Stream the value tuples of all records with the given schema."""
+        cursor = self._conn().execute(
+            "SELECT record_values FROM records WHERE session = ? AND schema_id = ? AND seq < ? ORDER BY seq",
+            (self.session, schema_id, self._stored_count())
+        )
+        for (values,) in _fetch_batches(cursor, self.FETCH_ROWS):
+            yield tuple(json.loads(values))
+        for pending_schema_id, values in self._pending_slice(0, len(self) - self._stored_count()):
+            if pending_schema_id == schema_id:
+                yield values
+
+    def runs(self, start=0, stop=None):
+        """Yield (field_names, value lists) for each run of consecutive records sharing a schema."""
+        stop = len(self) if stop is None else stop
+        for field_names, run in groupby(self._iter_range(start, stop), key=lambda record: record.field_names):
+            yield field_names, [record.values for record in run]
+
+    def _iter_range(self, start, stop):
+        """Yield records start..stop-1 with a streaming cursor."""
+        stored = self._stored_count()
+        if start < stored:
+            cursor = self._conn().execute(
+                "SELECT schema_id, record_values FROM records WHERE session = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (self.session, start, min(stop, stored))
+            )
+            for schema_id, values in _fetch_batches(cursor, self.FETCH_ROWS):
+                yield Record(self._schemas[schema_id], json.loads(values))
+        for schema_id, values in self._pending_slice(max(start, stored) - stored, stop - stored):
+            yield Record(self._schemas[schema_id], list(values))
+
+
+class SQLiteRecordStore(_SQLiteRecords):
+    """RecordStore-compatible session backend persisted in SQLite.
+
+    Appended records are buffered and written in one transaction (group
+    commit) once ``batch_size`` records are pending or when flush() is called,
+    which the app does on a timer.  The database runs in WAL mode, so the save
+    worker can read a snapshot while new records are being committed.  Records
+    survive a crash or restart up to the last commit, and reopening the file
+    resumes the session.
+
+    clear() starts a new session number instead of deleting rows in place, so
+    snapshots of the previous session stay readable until the next clear.
+    """
+
+    def __init__(self, path, batch_size=100):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.connection = _connect(path)
+        self.connection.executescript(SCHEMA_SQL)
+
+        self._schemas = {}
+        self._schema_ids = {}
+        self._pending = []
+        self._pending_meta = {}
+        for schema_id, field_names in self.connection.execute("SELECT id, field_names FROM schemas"):
+            self._remember_schema(schema_id, tuple(json.loads(field_names)))
+
+        self.session = int(self.get_meta('session', 1))
+        self._stored = self.connection.execute(
+            "SELECT COUNT(*) FROM records WHERE session = ?", (self.session,)
+        ).fetchone()[0]
+
+    def append(self, field_names, values):
+        """Buffer a record and return its index; commits when the batch is full."""
+        index = self._buffer(field_names, values)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        return index
+
+    def extend(self, records):
+        """Buffer (field_names, values) pairs, commit them in one transaction and return how many were added."""
+        count = 0
+        for field_names, values in records:
+            self._buffer(field_names, values)
+            count += 1
+        self.flush()
+        return count
+
+    def _buffer(self, field_names, values):
+        """Add a record to the pending batch and return its index."""
+        field_names = tuple(field_names)
+        if len(field_names) != len(values):
+            raise ValueError("field_names and values must have the same length")
+
+        schema_id = self._schema_ids.get(field_names)
+        if schema_id is None:
+            schema_id = self.connection.execute(
+                "INSERT INTO schemas (field_names) VALUES (?)", (json.dumps(field_names),)
+            ).lastrowid
+            self.connection.commit()
+            self._remember_schema(schema_id, field_names)
+
+        self._pending.append((schema_id, tuple(values)))
+        return self._stored + len(self._pending) - 1
+
+    def flush(self):
+        """Commit buffered records and metadata in one transaction."""
+        if not self._pending and not self._pending_meta:
+            return
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO records (session, seq, schema_id, record_values) VALUES (?, ?, ?, ?)",
+                (
+                    (self.session, self._stored + offset, schema_id, json.dumps(values))
+                    for offset, (schema_id, values) in enumerate(self._pending)
+                )
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                self._pending_meta.items()
+            )
+        self._stored += len(self._pending)
+        self._pending = []
+        self._pending_meta = {}
+
+    def clear(self):
+        """Start a new, empty session and drop sessions older than the previous one."""
+        self._pending = []
+        self._pending_meta = {}
+        previous = self.session
+        self.session += 1
+        self._stored = 0
+        with self.connection:
+            self.connection.execute("DELETE FROM records WHERE session < ?", (previous,))
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('session', ?)", (str(self.session),)
+            )
+
+    def snapshot(self):
+        """Commit pending records and return a read-only view usable from another thread."""
+        self.flush()
+        return SQLiteSnapshot(self)
+
+    def get_meta(self, key, default=None):
+        """Return a stored session setting, including ones not yet committed."""
+        if key in self._pending_meta:
+            return self._pending_meta[key]
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        """Buffer a session setting to commit with the next flush."""
+        self._pending_meta[key] = str(value)
+
+    def close(self):
+        """Commit anything pending and close the database."""
+        self.flush()
+        self.connection.close()
+
+    def _remember_schema(self, schema_id, field_names):
+        """Cache a schema in both directions."""
+        self._schemas[schema_id] = field_names
+        self._schema_ids[field_names] = schema_id
+
+    def _conn(self):
+        return self.connection
+
+    def _length(self):
+        return self._stored + len(self._pending)
+
+    def _stored_count(self):
+        return self._stored
+
+    def _pending_slice(self, start, stop):
+        return self._pending[max(0, start):max(0, stop)]
+
+
+class SQLiteSnapshot(_SQLiteRecords):
+    """Frozen view of committed session records, opened lazily in the reading thread."""
+
+    def __init__(self, store):
+        self.path = store.path
+        self.session = store.session
+        self._stored = store._stored
+        self._schemas = dict(store._schemas)
+        self._schema_ids = dict(store._schema_ids)
+        self._connection = None
+
+    def _conn(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path)
+        return self._connection
+
+    def _length(self):
+        return self._stored
+
+    def _stored_count(self):
+        return self._stored
+
+    def _pending_slice(self, start, stop):
+        return []
+
+
+def _fetch_batches(cursor, size):
+    """Yield rows from a cursor, fetching size rows at a time."""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
@@ -0,0 +1,180 @@
+import json
+import os
+import tempfile
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from csv_export import LAYOUT_RECORDS, DeltaCSVWriter, OutputStats, compression_for, iter_layout_blocks, write_row_blocks
+from ids import IDAllocator
+
+
+def lock_path(output_path):
+    """Lock file guarding appends to output_path."""
+    return output_path + '.lock'
+
+
+def lease_path(output_path):
+    """Lease file holding the next free ID for output_path."""
+    return output_path + '.ids'
+
+
+class FileLock:
+    """Exclusive advisory lock on a lock file, honoured by every app instance.
+
+    Uses flock() on POSIX and msvcrt.locking() on Windows.  Waits up to
+    timeout seconds and raises TimeoutError if the lock stays taken.
+    """
+
+    def __init__(self, path, timeout=10.0, poll_interval=0.005):
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._file = None
+
+    def acquire(self):
+        """Block until the lock is held."""
+        self._file = open(self.path, 'a+b')
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._lock()
+                return self
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self._file.close()
+                    self._file = None
+                    raise TimeoutError(f"Timed out waiting for lock: {self.path}")
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        """Release the lock and close the lock file."""
+        if self._file is None:
+            return
+        try:
+            if fcntl:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def _lock(self):
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class IDLease:
+    """Hands out IDs from blocks reserved in a lease file shared by all instances.
+
+    The lease file stores the next unreserved ID.  Each instance takes
+    block_size IDs at a time under the lease lock and then numbers records
+    from its block without touching the file, so IDs never repeat across
+    instances.  IDs left in a block when an instance exits are skipped.
+    """
+
+    def __init__(self, output_path, block_size=100, step=1):
+        self.output_path = output_path
+        self.path = lease_path(output_path)
+        self.block_size = max(1, block_size)
+        self.step = step
+        self.block = None
+        self.position = 0
+
+    def next(self, seed_id):
+        """Return the next ID of this instance's block, reserving a new block when it runs out.
+
+        seed_id starts the sequence if no instance has created the lease file yet.
+        """
+        if self.block is None or self.position >= len(self.block):
+            self.block = self.reserve(seed_id, self.block_size)
+            self.position = 0
+        leased_id = self.block[self.position]
+        self.position += 1
+        return leased_id
+
+    def reserve(self, seed_id, count):
+        """Reserve count consecutive IDs from the lease file and return them as an IDBlock."""
+        with FileLock(lock_path(self.path)):
+            state = self._read()
+            allocator = IDAllocator(state.get('next_id') or seed_id, state.get('step', self.step))
+            block = allocator.allocate(count)
+            self._write({'next_id': allocator.current, 'step': allocator.step})
+        return block
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write(self, state):
+        """Replace the lease file durably; a lost update would hand out IDs twice."""
+        directory = os.path.dirname(self.path)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.csv_populator_', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+class SharedCSVWriter(DeltaCSVWriter):
+    """Append-only writer for an output file that several app instances write to.
+
+    Every save appends only this instance's records added since its last save,
+    under the output's lock, so instances never overwrite each other.  Only the
+    header-per-record layout can be shared, since each instance's records
+    interleave in the file.
+    """
+
+    def save(self, path, records, progress=None, layout=LAYOUT_RECORDS, dedupe=False):
+        """Append records not yet written to path and return ('append', number written)."""
+        if layout != LAYOUT_RECORDS:
+            raise ValueError("Shared output files only support the header-per-record layout")
+
+        path = os.path.abspath(path)
+        if path != self.path:
+            self.saved_count = 0
+            self.seen = None
+        total = len(records)
+        start = min(self.saved_count, total)
+        seen = self._seen_before(records, start) if dedupe else None
+
+        written = 0
+        self.stats = OutputStats(0, 0)
+        if start < total:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with FileLock(lock_path(path)):
+                output = self.csv_format.open(path, 'a', compression_for(path))
+                with output as f:
+                    blocks = iter_layout_blocks(records, layout, start, seen=seen)
+                    written = write_row_blocks(f, blocks, self.csv_format, total - start, progress)
+                self.stats = output.stats
+
+        self.path = path
+        self.saved_count = total
+        self.layout = layout
+        self.seen = seen
+        return 'append', written
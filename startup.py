@@ -0,0 +1,38 @@
+import json
+import sys
+import time
+
+
+class StartupTimer:
+    """Start-up milestones in milliseconds since the main module began loading.
+
+    The app marks 'window_built', 'first_paint' and 'interactive'; main()
+    marks 'imports'.  Once interactive, the report is written to dump_path
+    (or stderr) and on_interactive, if set, is called.
+    """
+
+    def __init__(self, started, dump_path=None):
+        self.started = started
+        self.dump_path = dump_path
+        self.marks = {}
+        self.on_interactive = None
+
+    def mark(self, name):
+        """Record the elapsed time under name; later marks of the same name are ignored."""
+        self.marks.setdefault(name, round((time.perf_counter() - self.started) * 1000, 1))
+
+    def interactive(self):
+        """Mark the window interactive, report, and run the on_interactive hook."""
+        self.mark('interactive')
+        self.dump()
+        if self.on_interactive:
+            self.on_interactive()
+
+    def dump(self):
+        """Write the milestones as JSON."""
+        text = json.dumps(self.marks, indent=2)
+        if self.dump_path:
+            with open(self.dump_path, 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+        elif sys.stderr:  # no console in the windowed build
+            print(text, file=sys.stderr)
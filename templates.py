@@ -0,0 +1,81 @@
+import json
+import os
+from collections import OrderedDict, namedtuple
+
+from validation import compile_rules
+
+
+Template = namedtuple('Template', ['field_names', 'rules'])
+
+
+def parse_template(template_data):
+    """Extract the list of field names from parsed template JSON."""
+    if isinstance(template_data, list):
+        return template_data
+    elif isinstance(template_data, dict) and 'fields' in template_data:
+        return template_data['fields']
+    elif isinstance(template_data, dict):
+        return list(template_data.keys())
+    raise ValueError("Invalid JSON template format")
+
+
+def parse_template_rules(template_data):
+    """Extract the per-field validation rule specs from parsed template JSON.
+
+    Rules come from a "rules" object next to "fields", or from the values of a
+    {field name: rule} template.
+    """
+    if not isinstance(template_data, dict):
+        return {}
+    if 'fields' in template_data:
+        rules = template_data.get('rules', {})
+        if not isinstance(rules, dict):
+            raise ValueError("Template 'rules' must be an object")
+        return rules
+    return {name: spec for name, spec in template_data.items() if isinstance(spec, dict)}
+
+
+def read_template(filename):
+    """Read a template file and return its field names."""
+    with open(filename, 'r', encoding='utf-8') as f:
+        template_data = json.load(f)
+    return parse_template(template_data)
+
+
+def load_template(filename):
+    """Read a template file and return a Template with its rules compiled."""
+    with open(filename, 'r', encoding='utf-8') as f:
+        template_data = json.load(f)
+    return Template(parse_template(template_data), compile_rules(parse_template_rules(template_data)))
+
+
+class TemplateCache:
+    """LRU cache of parsed templates keyed by path.
+
+    Entries are checked against the file's mtime and size on every lookup,
+    so an edited template is read (and its rules compiled) again while an
+    unchanged one costs a stat.
+    """
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, filename):
+        """Return a template's Template, reading it only if unseen or changed."""
+        path = os.path.abspath(filename)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != stamp:
+            entry = self._entries[path] = (stamp, load_template(path))
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        template = entry[1]
+        return Template(list(template.field_names), template.rules)
+
+    def recent(self):
+        """Paths of the cached templates, most recently used first."""
+        return list(reversed(self._entries))
@@ -0,0 +1,141 @@
+import queue
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+
+RULE_KEYS = {'type', 'regex', 'min', 'max', 'required', 'enum', 'format'}
+TYPES = ('str', 'int', 'float', 'date')
+DEFAULT_DATE_FORMAT = '%Y-%m-%d'
+
+
+class FieldRule:
+    """Compiled validation rule for one template field.
+
+    Built once per template load from a spec such as::
+
+        {"type": "int", "min": 1, "max": 500, "required": true}
+        {"regex": "[A-Z]{2}-\\d{4}"}
+        {"type": "date", "format": "%d/%m/%Y"}
+        {"enum": ["open", "closed"]}
+
+    check() returns an error message, or None when the value is valid.
+    """
+
+    def __init__(self, name, spec):
+        if not isinstance(spec, dict):
+            raise ValueError(f"Rule for '{name}' must be an object")
+        unknown = set(spec) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"Rule for '{name}' has unknown keys: {', '.join(sorted(unknown))}")
+
+        self.name = name
+        self.spec = dict(spec)
+        self.required = bool(spec.get('required', False))
+        self.kind = spec.get('type', 'str')
+        if self.kind not in TYPES:
+            raise ValueError(f"Rule for '{name}' has unknown type '{self.kind}'")
+        self.date_format = spec.get('format', DEFAULT_DATE_FORMAT)
+
+        try:
+            self.pattern = re.compile(spec['regex']) if 'regex' in spec else None
+        except re.error as e:
+            raise ValueError(f"Rule for '{name}' has an invalid regex: {e}")
+        self.choices = frozenset(str(choice) for choice in spec['enum']) if 'enum' in spec else None
+
+        # Bounds are converted once, to the same type as the values they limit
+        self.minimum = self._bound(spec.get('min'))
+        self.maximum = self._bound(spec.get('max'))
+
+    def check(self, value):
+        """Return an error message for value, or None if it passes."""
+        if not value:
+            return "required" if self.required else None
+        if self.choices is not None and value not in self.choices:
+            return f"must be one of: {', '.join(sorted(self.choices))}"
+        if self.pattern is not None and not self.pattern.fullmatch(value):
+            return f"must match {self.pattern.pattern}"
+
+        if self.kind == 'str':
+            return None
+        try:
+            converted = self._convert(value)
+        except ValueError:
+            if self.kind == 'date':
+                return f"must be a date like {datetime(2024, 12, 31).strftime(self.date_format)}"
+            return f"must be {'a whole number' if self.kind == 'int' else 'a number'}"
+
+        if self.minimum is not None and converted < self.minimum:
+            return f"must be at least {self.spec['min']}"
+        if self.maximum is not None and converted > self.maximum:
+            return f"must be at most {self.spec['max']}"
+        return None
+
+    def _convert(self, value):
+        if self.kind == 'int':
+            return int(value)
+        if self.kind == 'float':
+            return float(value)
+        return datetime.strptime(value, self.date_format)
+
+    def _bound(self, bound):
+        if bound is None:
+            return None
+        if self.kind == 'str':
+            raise ValueError(f"Rule for '{self.name}' needs a type for min/max")
+        try:
+            return self._convert(str(bound))
+        except ValueError:
+            raise ValueError(f"Rule for '{self.name}' has an invalid bound: {bound}")
+
+
+def compile_rules(specs):
+    """Compile {field name: spec} into {field name: FieldRule}."""
+    return {name: FieldRule(name, spec) for name, spec in specs.items()}
+
+
+class ValidationWorker:
+    """Run field checks on a background thread.
+
+    submit() queues a (rule, value) under a key; a newer submission for the
+    same key replaces one still waiting.  Results are posted to ``events`` as
+    (key, rule, value, message) for the main thread to poll.
+    """
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self._jobs = OrderedDict()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="csv-validation-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, rule, value):
+        """Queue a check of value against rule."""
+        with self._condition:
+            self._jobs.pop(key, None)
+            self._jobs[key] = (rule, value)
+            self._condition.notify()
+
+    def close(self, timeout=None):
+        """Drop queued checks and stop the thread."""
+        with self._condition:
+            self._closed = True
+            self._jobs.clear()
+            self._condition.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._jobs and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                key, (rule, value) = self._jobs.popitem(last=False)
+            try:
+                message = rule.check(value)
+            except Exception as e:
+                message = f"could not be checked: {e}"
+            self.events.put((key, rule, value, message))